@@ -2,6 +2,7 @@ from flask import Flask, render_template, redirect, jsonify
 from flask_cors import CORS
 from views.job_composer import job_composer
 from views.api import api
+from views.api.json_encoder import FastJSONEncoder
 import yaml
 import os
 import sqlite3
@@ -9,6 +10,8 @@ import re
 import logging
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
+# jsonify() through orjson/ujson when installed; see views/api/json_encoder.py.
+app.json_encoder = FastJSONEncoder
 APP_ROOT = os.path.dirname(os.path.abspath(__file__))
 
 def detect_env():
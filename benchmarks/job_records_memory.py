@@ -0,0 +1,100 @@
+"""
+Compare the memory held by parsed job records on a synthetic queue.
+
+Builds a fake `squeue` dump and parses it twice: once into the per-job dicts
+the job routes used to cache, once into JobRecord objects with interned
+strings. Run from the repository root with the app's dependencies installed:
+
+    python benchmarks/job_records_memory.py [--jobs 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from views.api.jobs import _normalize_job_state, _parse_gpu_count, _parse_squeue_details  # noqa: E402
+from views.api.utils import safe_int  # noqa: E402
+
+PARTITIONS = ["cpu", "gpu", "bigmem", "xlong", "staff", "gpu_debug"]
+STATES = ["PD"] * 7 + ["R"] * 3
+REASONS = ["(Priority)", "(Resources)", "(Dependency)", "(QOSMaxJobsPerUserLimit)"]
+
+
+def build_squeue_output(job_count, seed=42):
+    rng = random.Random(seed)
+    lines = []
+    for index in range(job_count):
+        state = rng.choice(STATES)
+        lines.append("|".join([
+            str(9000000 + index),
+            f"run_{rng.randrange(5000)}",
+            f"user{rng.randrange(1500)}",
+            f"{rng.randrange(100000, 100400)}",
+            rng.choice(PARTITIONS),
+            state,
+            str(rng.randrange(1, 8)),
+            str(rng.choice([1, 8, 48, 96, 192])),
+            rng.choice(["N/A", "gres/gpu:1", "gres/gpu:2"]),
+            "0:00" if state == "PD" else f"{rng.randrange(1, 48)}:{rng.randrange(60):02d}:00",
+            rng.choice(["1:00:00", "2-00:00:00", "7-00:00:00"]),
+            f"2026-10-{rng.randrange(1, 28):02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+            rng.choice(REASONS) if state == "PD" else f"c{rng.randrange(900):03d}",
+        ]))
+    return "\n".join(lines)
+
+
+def parse_as_dicts(output):
+    """The dict layout _parse_squeue_details produced before JobRecord."""
+    jobs = []
+    for line in output.splitlines():
+        fields = line.split("|")
+        (job_id, job_name, user, account, partition, state, nodes, cpus, gpus,
+         runtime, time_limit, submit_time) = fields[:12]
+        jobs.append({
+            "job_id": job_id,
+            "job_name": job_name,
+            "user": user,
+            "account": account,
+            "partition": partition,
+            "state": _normalize_job_state(state),
+            "state_raw": state,
+            "nodes": safe_int(nodes, 0),
+            "cpus": safe_int(cpus, 0),
+            "gpus": _parse_gpu_count(gpus),
+            "runtime": runtime,
+            "time_limit": time_limit,
+            "submit_time": submit_time,
+            "reason": fields[12] if len(fields) > 12 else "",
+            "source": "squeue",
+        })
+    return jobs
+
+
+def measure(label, parse, output):
+    tracemalloc.start()
+    started = time.perf_counter()
+    jobs = parse(output)
+    elapsed = time.perf_counter() - started
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {len(jobs):>8} jobs  {current / 1024 / 1024:8.1f} MiB held  {elapsed:6.2f}s to parse")
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100000)
+    args = parser.parse_args()
+
+    output = build_squeue_output(args.jobs)
+    dict_bytes = measure("dicts", parse_as_dicts, output)
+    record_bytes = measure("JobRecord", _parse_squeue_details, output)
+    print(f"JobRecord layout uses {record_bytes / dict_bytes:.0%} of the dict layout")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Compare JSON encode time for three API payloads under Flask's stock encoder
+and FastJSONEncoder (plus raw orjson/ujson when installed).
+
+Payloads are read from benchmarks/fixtures/:
+
+    jobs_list_all_users.json   /api/jobs/list?user=all&state=all&page_size=200
+    available_modules.json     /api/available_modules
+    gpu_resources.json         /api/gpu-resources
+
+Record them on a cluster login node, where squeue/sacct/scontrol and the
+modules catalog are available, with --record. A missing fixture is replaced
+by a synthetic stand-in of the same shape (the module catalog falls back to
+modules/<cluster>-modules.json); the output then starts with a warning and
+its source column says which was used. Run
+from the repository root:
+
+    python benchmarks/json_encoders.py [--record] [--cluster grace] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask, json as flask_json  # noqa: E402
+from flask.json import JSONEncoder  # noqa: E402
+
+from views.api.job_table import JobRecord  # noqa: E402
+from views.api.json_encoder import FastJSONEncoder  # noqa: E402
+from views.api.serialization import orjson, ujson  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+FIXTURES = {
+    "jobs_list_all_users": "/api/jobs/list?user=all&state=all&page_size=200",
+    "available_modules": "/api/available_modules",
+    "gpu_resources": "/api/gpu-resources",
+}
+STATES = ["RUNNING", "PENDING", "COMPLETED", "FAILED", "CANCELLED", "TIMEOUT"]
+
+
+def record_fixtures(cluster):
+    """Call each route in-process and save its JSON body as a fixture."""
+    from views.api import api
+
+    app = Flask(__name__, root_path=ROOT)
+    app.config.update(cluster_name=cluster)
+    app.register_blueprint(api, url_prefix="/api")
+    client = app.test_client()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, url in FIXTURES.items():
+        response = client.get(url)
+        if response.status_code != 200:
+            print(f"{url}: HTTP {response.status_code}, not recorded: {response.get_data(as_text=True)[:200]}")
+            continue
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(response.get_json(), f)
+        print(f"recorded {name}.json from {url}")
+
+
+def synthetic_jobs_list(job_count=200, seed=42):
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(job_count):
+        state = rng.choice(STATES)
+        jobs.append(JobRecord(
+            job_id=str(9000000 + index),
+            job_name=f"run_{rng.randrange(1000)}.slurm",
+            user=f"user{rng.randrange(400)}",
+            account=f"1{rng.randrange(10**11):011d}",
+            partition=rng.choice(["cpu", "gpu", "xlong", "bigmem"]),
+            state=state,
+            state_raw=state,
+            nodes=str(rng.randrange(1, 9)),
+            cpus=str(rng.choice([1, 4, 48, 96, 192])),
+            gpus=str(rng.choice([0, 0, 1, 4])),
+            runtime=f"{rng.randrange(48):02d}:{rng.randrange(60):02d}:00",
+            time_limit="2-00:00:00",
+            submit_time="2026-10-18T08:00:00",
+            reason="None" if state != "PENDING" else "Priority",
+            exit_code="0:0",
+            end_time="2026-10-18T09:00:00" if state not in ("RUNNING", "PENDING") else None,
+            source="sacct",
+        ).to_dict())
+    return {"jobs": jobs, "page": 1, "page_size": job_count, "total": 48213, "has_next": True,
+            "cache": {"age": 3.2, "stale": False}}
+
+
+def synthetic_gpu_resources():
+    return {
+        "partition": "gpu",
+        "excluded_partitions": ["gpu_debug"],
+        "nodes": {"busy": 98, "total": 117, "available": 12},
+        "gpus": {"allocated": 301, "total": 368},
+        "source_fields": {
+            "partitions": "Partitions",
+            "node_state": "State",
+            "total_gpus": ["CfgTRES", "Gres"],
+            "allocated_gpus": "AllocTRES",
+        },
+    }
+
+
+def load_payloads(cluster):
+    fallbacks = {
+        "jobs_list_all_users": ("synthetic", synthetic_jobs_list),
+        "available_modules": (
+            f"modules/{cluster}-modules.json",
+            lambda: json.load(open(os.path.join(ROOT, "modules", f"{cluster}-modules.json"), encoding="utf-8")),
+        ),
+        "gpu_resources": ("synthetic", synthetic_gpu_resources),
+    }
+
+    payloads = []
+    for name in FIXTURES:
+        path = os.path.join(FIXTURES_DIR, f"{name}.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                payloads.append((name, "recorded", json.load(f)))
+        else:
+            source, build = fallbacks[name]
+            payloads.append((name, source, build()))
+    return payloads
+
+
+def time_encoder(app, payload, repeat):
+    """Best-of-repeat seconds for flask.json.dumps(payload) under app's encoder."""
+    best = float("inf")
+    with app.app_context():
+        flask_json.dumps(payload)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            flask_json.dumps(payload)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_call(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--record", action="store_true", help="record fixtures from the live routes first")
+    parser.add_argument("--cluster", default="grace")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.cluster)
+
+    stock_app = Flask("stock")
+    stock_app.json_encoder = JSONEncoder
+    fast_app = Flask("fast")
+    fast_app.json_encoder = FastJSONEncoder
+
+    payloads = load_payloads(args.cluster)
+    synthetic = [name for name, source, _payload in payloads if source == "synthetic"]
+    if synthetic:
+        print(
+            f"WARNING: no recorded fixture for {', '.join(synthetic)}; timing SYNTHETIC stand-ins. "
+            f"Run with --record on a login node before quoting these numbers.\n"
+        )
+
+    print(f"{'payload':<22} {'source':<28} {'bytes':>10} {'flask json':>11} {'FastJSONEncoder':>16} {'orjson':>8} {'ujson':>8}")
+    for name, source, payload in payloads:
+        with stock_app.app_context():
+            size = len(flask_json.dumps(payload).encode("utf-8"))
+
+        stock = time_encoder(stock_app, payload, args.repeat)
+        fast = time_encoder(fast_app, payload, args.repeat)
+        raw_orjson = (
+            f"{time_call(lambda: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), args.repeat) * 1000:7.2f}ms"
+            if orjson is not None else f"{'-':>9}"
+        )
+        raw_ujson = (
+            f"{time_call(lambda: ujson.dumps(payload, sort_keys=True), args.repeat) * 1000:7.2f}ms"
+            if ujson is not None else f"{'-':>9}"
+        )
+        print(
+            f"{name:<22} {source:<28} {size:>10} {stock * 1000:9.2f}ms {fast * 1000:14.2f}ms "
+            f"{raw_orjson} {raw_ujson}  ({stock / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Time the scontrol record tokenizer on a synthetic `scontrol show nodes` dump.
+
+Compares the old approach (split each node's text on whitespace, then run a
+DOTALL regex over it once per free-text key) with iter_scontrol_records, in
+both the multi-line and --oneliner output formats. Run from the repository
+root:
+
+    python benchmarks/scontrol_tokenizer.py [--nodes 5000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from views.api.utils import iter_scontrol_records  # noqa: E402
+
+STATES = ["IDLE", "MIXED", "ALLOCATED", "DOWN+DRAIN", "MIXED+DRAIN", "IDLE+MAINT"]
+FREE_TEXT_KEYS = ("Reason", "ReasonUid", "ReasonTime")
+
+
+def build_node_lines(node_count, seed=42):
+    """Return one list of lines per node, in scontrol's multi-line layout."""
+    rng = random.Random(seed)
+    nodes = []
+    for index in range(node_count):
+        name = f"c{index:05d}"
+        state = rng.choice(STATES)
+        alloc = rng.randrange(0, 193)
+        lines = [
+            f"NodeName={name} Arch=x86_64 CoresPerSocket=48",
+            f"   CPUAlloc={alloc} CPUEfctv=192 CPUTot=192 CPULoad={rng.random() * 192:.2f}",
+            "   AvailableFeatures=icx,nvme ActiveFeatures=icx,nvme",
+            f"   Gres={'gpu:a100:4(S:0-1)' if index % 10 == 0 else '(null)'}",
+            f"   NodeAddr={name} NodeHostName={name} Version=23.02.7",
+            "   OS=Linux 5.14.0-284.30.1.el9_2.x86_64 #1 SMP PREEMPT_DYNAMIC Fri Aug 25 09:13:12 EDT 2023",
+            f"   RealMemory=512000 AllocMem={alloc * 2000} FreeMem={rng.randrange(1000, 500000)} Sockets=4 Boards=1",
+            f"   State={state} ThreadsPerCore=1 TmpDisk=0 Weight=1 Owner=N/A MCS_label=N/A",
+            f"   Partitions={'gpu,gpu_debug' if index % 10 == 0 else 'cpu,xlong'}",
+            "   BootTime=2026-10-01T08:00:00 SlurmdStartTime=2026-10-01T08:02:11",
+            "   LastBusyTime=2026-10-18T09:00:00 ResumeAfterTime=None",
+            f"   CfgTRES=cpu=192,mem=500G,billing=192 AllocTRES=cpu={alloc}",
+            "   CapWatts=n/a",
+            "   CurrentWatts=0 AveWatts=0",
+            "   ExtSensorsJoules=n/s ExtSensorsWatts=0 ExtSensorsTemp=n/s",
+        ]
+        if "DRAIN" in state or "MAINT" in state:
+            lines.append(f"   Reason=Node unexpectedly rebooted boot_time={1790000000 + index} [root@2026-10-17T12:00:00]")
+            lines.append("   ReasonUid=root(0) ReasonTime=2026-10-17T12:00:00")
+        nodes.append(lines)
+    return nodes
+
+
+def legacy_parse(node_texts):
+    """
+    The old helpers applied to every node: whitespace-split tokens
+    (parse_key_value_tokens) plus one DOTALL regex per free-text key
+    (_get_scontrol_value), as _parse_scontrol_node_output did per node.
+    """
+    nodes = []
+    for text in node_texts:
+        node = {}
+        for token in text.split():
+            if "=" not in token:
+                continue
+            key, value = token.split("=", 1)
+            node[key] = value
+
+        for key in FREE_TEXT_KEYS:
+            match = re.search(rf"(?:^|\s){re.escape(key)}=(.*?)(?=\s+\S+=|\s*$)", text, re.DOTALL)
+            if match:
+                node[key] = match.group(1).strip()
+
+        nodes.append(node)
+
+    return nodes
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    nodes = build_node_lines(args.nodes)
+    multi_line = "\n".join("\n".join(lines) + "\n" for lines in nodes)
+    one_line = "\n".join(" ".join(line.strip() for line in lines) for lines in nodes) + "\n"
+
+    node_texts = ["\n".join(lines) for lines in nodes]
+    legacy_time, legacy_nodes = best_of(args.repeat, lambda: legacy_parse(node_texts))
+    multi_time, multi_nodes = best_of(args.repeat, lambda: list(iter_scontrol_records(multi_line.splitlines())))
+    one_time, one_nodes = best_of(args.repeat, lambda: list(iter_scontrol_records(one_line.splitlines())))
+
+    assert len(legacy_nodes) == len(multi_nodes) == len(one_nodes) == args.nodes
+    assert multi_nodes == one_nodes
+    assert multi_nodes[0]["OS"].startswith("Linux 5.14.0") and " " in multi_nodes[0]["OS"]
+
+    print(f"{args.nodes} nodes, {len(multi_line) / 1024 / 1024:.1f} MiB of scontrol output, best of {args.repeat}")
+    print(f"legacy split + per-key regex   {legacy_time * 1000:8.1f} ms  (OS={legacy_nodes[0]['OS']!r})")
+    print(f"iter_scontrol_records          {multi_time * 1000:8.1f} ms")
+    print(f"iter_scontrol_records -o       {one_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -91,6 +91,11 @@ source .venv/bin/activate
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
 
+# Precompile the module catalogs so the first Software Modules request in a
+# worker loads a snapshot instead of parsing the JSON catalog.
+echo "Building module catalog snapshots..."
+python views/api/module_catalog.py modules/*-modules.json
+
 #Node Dependencies
 echo "Installing Node dependencies and building..."
 npm install -D babel-loader @babel/core @babel/preset-react
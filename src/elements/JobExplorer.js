@@ -116,6 +116,7 @@ const JobExplorer = () => {
   const [page, setPage] = useState(1);
   const [hasNext, setHasNext] = useState(false);
   const [total, setTotal] = useState(null);
+  const [cacheInfo, setCacheInfo] = useState(null);
   const [filters, setFilters] = useState({
     search: "",
     user: "",
@@ -177,6 +178,7 @@ const JobExplorer = () => {
         setPage(data.page || nextPage);
         setHasNext(Boolean(data.has_next));
         setTotal(data.total === undefined ? null : data.total);
+        setCacheInfo(data.cache || null);
         setWarnings(data.warnings || []);
       })
       .catch((err) => setError(err.message))
@@ -206,8 +208,9 @@ const JobExplorer = () => {
   const filterSummary = useMemo(() => {
     const stateLabel = filters.state === "active" ? "Active" : filters.state || "All";
     const countLabel = total === null ? `${jobs.length} loaded` : `${jobs.length} of ${total} loaded`;
-    return `${stateLabel} jobs - ${countLabel}`;
-  }, [filters.state, jobs.length, total]);
+    const staleLabel = cacheInfo && cacheInfo.stale ? ` - updated ${Math.round(cacheInfo.age)}s ago, refreshing` : "";
+    return `${stateLabel} jobs - ${countLabel}${staleLabel}`;
+  }, [filters.state, jobs.length, total, cacheInfo]);
 
   const options = useMemo(
     () => ({
@@ -448,6 +451,8 @@ const JobExplorer = () => {
             <option value="7d">7 days</option>
             <option value="14d">14 days</option>
             <option value="30d">30 days</option>
+            <option value="90d">90 days</option>
+            <option value="1y">1 year</option>
           </select>
           <datalist id="job-explorer-partitions">
             {options.partition.map((option) => <option key={option} value={option} />)}
@@ -18,13 +18,14 @@ All routes are registered under the /api prefix (set in app.py).
 
   info.py         — Read-only cluster state queries
     GET    /user-data                 Current user's username and institutional email
-    GET    /sinfo                     Raw node info from retrieve_sinfo
+    GET    /sinfo                     Per-queue availability from retrieve_sinfo (cached, ETag)
     GET    /showquota                 Disk/file quota usage per filesystem
     GET    /groups                    Groups the current user belongs to
+    GET    /nodes                     One row per node and partition with its sinfo-style state
     GET    /cpuavail                  Node configuration and CPU availability
     GET    /system-load               Web server load averages and normalized 5m load
     GET    /gpu-resources             GPU node and GPU allocation counts for the gpu partition
-    GET    /node/<node_name>          Detailed SLURM node information
+    GET    /node/<node_name>          Detailed SLURM node information (from the node snapshot)
     GET    /node/<node_name>/jobs     Jobs currently running on a node
 
   modules.py      — Python virtual environment management
@@ -35,6 +36,11 @@ All routes are registered under the /api prefix (set in app.py).
     GET    /available_modules          List raw modules for the configured cluster
     GET    /available_modules/summary  Grouped module card summaries
     GET    /available_modules/details  Details for one named module
+    GET    /available_modules/search?q=  Ranked, paged summary search with facets
+    GET    /available_modules/resolve?name=  Candidate `module load` plans per version
+    GET    /available_modules/where?name=    Clusters and versions providing a module
+                                      The catalog routes above accept cluster=<name>
+                                      to read another cluster's catalog
 
   jobs.py         — SLURM job and project management
     GET    /jobs                      Active jobs for current user (squeue only)
@@ -42,11 +48,13 @@ All routes are registered under the /api prefix (set in app.py).
     GET    /jobs/past_jobs            Paginated 24-hour history for the current user
     GET    /jobs/<job_id>             Lazy single-job details (scontrol)
     GET    /jobs/details              Legacy active Slurm job records for Job Explorer
+    GET    /jobs/details?ids=         scontrol details for many jobs from one scontrol pass
     GET    /jobs/summary              Aggregate Slurm job counts for Job Explorer
     POST   /cancel_job/<job_id>       Cancel a job via scancel
     GET    /projectinfo               Project accounts, job history, or pending jobs
     POST   /set_default_account       Set default myproject account
-    GET    /utilization               Cluster-wide node/CPU/job utilization (pestat)
+    GET    /utilization               Cluster-wide node/CPU/job utilization (shared node snapshot)
+    GET    /cache/stats               Slurm cache hit/miss/eviction counters per key namespace
 
   bot_requests.py — HPRC support request form submissions
     POST   /quota                     Quota increase request (bot, falls back to email)
@@ -64,6 +72,16 @@ All routes are registered under the /api prefix (set in app.py).
     PUT    /admin/announcements/order Reorder all announcements
 
 
+Conditional GET
+---------------
+  Read-only GET routes are wrapped in http_cache.conditional_get: responses
+  carry an ETag and a per-route Cache-Control, and a matching If-None-Match
+  is answered with an empty 304.
+
+  JSON responses over 1 KB are gzip- or brotli-encoded by compression.py,
+  which keeps compressed bodies per ETag so versioned payloads such as the
+  module catalog are compressed once.
+
 Adding a new route module
 --------------------------
   1. Create a new file in this directory (e.g. my_feature.py)
@@ -71,6 +89,7 @@ Adding a new route module
   3. Define routes with @api.route(...)
   4. Add `from . import my_feature` in the imports block below
   5. Add it to the route index above
+  6. Wrap read-only GET routes in @conditional_get() from .http_cache
 """
 
 from flask import Blueprint
@@ -84,3 +103,4 @@ from . import modules      # /get_env, /delete_env, /get_py_versions, /create_ve
 from . import jobs         # /jobs, /cancel_job, /projectinfo, /set_default_account, /utilization
 from . import bot_requests # /quota, /group, /help, /software, /account, /submit_acknowledgement
 from . import announcement # /announcements
+from . import compression  # gzip/brotli for large JSON responses (no routes)
@@ -13,6 +13,8 @@ from urllib.parse import urlsplit
 from flask import current_app, jsonify, request
 
 from . import api
+from .http_cache import conditional_get, json_bytes_response, not_modified, version_etag
+from .serialization import SerializedPayloads
 
 try:
     from zoneinfo import ZoneInfo
@@ -27,6 +29,9 @@ _LOCAL_TIMESTAMP_FORMATS = ("%Y-%m-%d %I:%M %p", "%Y-%m-%d %H:%M")
 _ANNOUNCEMENTS_FILE = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..", "var", "announcements", "announcements.json")
 )
+# The last validated document, reused until the file's inode, mtime or size changes.
+_validated_document = {"path": None, "signature": None, "validated": None}
+_serialized_payloads = SerializedPayloads()
 
 
 class AnnouncementValidationError(ValueError):
@@ -244,11 +249,24 @@ def _read_document(path):
     return _decode_document(contents), hashlib.sha256(contents).hexdigest()
 
 
-def load_active_announcements(path, now=None):
-    """Load, validate, and time-filter a complete announcement document."""
+def _document_signature(path):
+    details = os.stat(path)
+    return details.st_ino, details.st_mtime_ns, details.st_size
+
+
+def _load_validated_document(path):
+    """Return (signature, validated announcements), re-reading the file only when it changed."""
+    signature = _document_signature(path)
+    if _validated_document["path"] == path and _validated_document["signature"] == signature:
+        return signature, _validated_document["validated"]
+
     document, _revision = _read_document(path)
     validated = validate_announcement_document(document)
+    _validated_document.update({"path": path, "signature": signature, "validated": validated})
+    return signature, validated
 
+
+def _filter_active(validated, now=None):
     current_time = now or datetime.now(timezone.utc)
     if current_time.tzinfo is None or current_time.utcoffset() is None:
         raise ValueError("now must include timezone information")
@@ -266,6 +284,12 @@ def load_active_announcements(path, now=None):
     return active
 
 
+def load_active_announcements(path, now=None):
+    """Load, validate, and time-filter a complete announcement document."""
+    _signature, validated = _load_validated_document(path)
+    return _filter_active(validated, now)
+
+
 def _management_error(message, status):
     return jsonify({"error": message}), status
 
@@ -399,18 +423,36 @@ def _mutation_response(operation):
 
 
 @api.route("/announcements", methods=["GET"])
+@conditional_get()
 def get_announcements():
     path = _announcements_path()
     response = {"announcements": [], "can_manage": _can_manage(path)}
-    if str(current_app.config.get("dashboard_url", "")).startswith("/pun/dev/"):
-        response["management_diagnostics"] = _management_diagnostics(path)
+    signature = None
     try:
-        response["announcements"] = load_active_announcements(path)
+        signature, validated = _load_validated_document(path)
+        response["announcements"] = _filter_active(validated)
     except (OSError, json.JSONDecodeError, AnnouncementValidationError, TypeError) as exc:
         current_app.logger.error(
             "Unable to load announcements from %s: %s", path, exc
         )
-    return jsonify(response)
+
+    if str(current_app.config.get("dashboard_url", "")).startswith("/pun/dev/"):
+        # Diagnostics describe the live file state, so this body is never reused.
+        response["management_diagnostics"] = _management_diagnostics(path)
+        return jsonify(response)
+
+    # The body only changes with the file, the manager check and which
+    # announcements are inside their schedule window right now.
+    version = (
+        path,
+        signature,
+        response["can_manage"],
+        tuple(announcement["id"] for announcement in response["announcements"]),
+    )
+    etag = version_etag(*version)
+    return not_modified(etag) or json_bytes_response(
+        _serialized_payloads.get("announcements", version, lambda: response), etag
+    )
 
 
 @api.route("/admin/announcements", methods=["GET"])
@@ -1,50 +1,688 @@
 """
-Small in-process TTL cache for inexpensive reuse of backend command results.
+Small TTL cache for inexpensive reuse of backend command results.
+
+Concurrent misses for the same key are coalesced: the first caller runs the
+loader while the others wait for its result, so a burst of dashboard requests
+starts one Slurm command instead of one per request. A load that is still
+running when its key is invalidated does not store its result, so a
+snapshot read before e.g. a scancel cannot reappear after it.
+
+Entries may also be served stale-while-revalidate: once a value passes its
+TTL it is still returned for up to ``max_stale_seconds`` while a background
+thread reloads it. Past that hard bound the caller blocks on a fresh load.
+
+A TTL of None keeps an entry until it is evicted or invalidated, for values
+that can no longer change (e.g. finished jobs).
+
+Entries live in a pluggable backend. MemoryBackend keeps them in the current
+process; SQLiteBackend stores them in a file so every Passenger worker of the
+same user shares one copy under one expiry. Both are bounded by entry count
+and estimated bytes and evict the least recently used entry first.
 """
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
 import time
-from threading import Lock
+from collections import OrderedDict, defaultdict, namedtuple
+from itertools import islice
+from threading import Event, Lock, Thread, local
 
+# value: the cached object; age: seconds since it was loaded;
+# stale: True when the value is past its TTL and a refresh is running;
+# loaded_at: the backend clock time the value was stored, which identifies
+# its version, or None when the value was not stored.
+CacheResult = namedtuple("CacheResult", ["value", "age", "stale", "loaded_at"])
 
-class TTLCache:
-    def __init__(self):
-        self._entries = {}
+_DEFAULT_MAX_ENTRIES = 512
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_SWEEP_INTERVAL = 60
+_SIZE_SAMPLE = 256
+_ACCESS_WRITE_INTERVAL = 30
+_SQLITE_SCHEMA_VERSION = 2
+
+
+def key_namespace(key):
+    """Return the stats bucket for a key: its leading tag, e.g. "squeue-snapshot"."""
+    if isinstance(key, tuple) and key and isinstance(key[0], str):
+        return key[0]
+    return "default"
+
+
+def estimate_size(value, _seen=None):
+    """
+    Roughly estimate the bytes held by value and the containers inside it.
+
+    Containers longer than _SIZE_SAMPLE items are estimated from their first
+    _SIZE_SAMPLE items, so sizing a 50k-job table stays in the milliseconds.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += _sampled_size(
+            value.items(), len(value), lambda item: estimate_size(item[0], _seen) + estimate_size(item[1], _seen)
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += _sampled_size(value, len(value), lambda item: estimate_size(item, _seen))
+    elif hasattr(value, "__slots__"):
+        size += sum(estimate_size(getattr(value, slot, None), _seen) for slot in value.__slots__)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _seen)
+
+    return size
+
+
+def _sampled_size(items, length, measure):
+    sample = list(islice(items, _SIZE_SAMPLE))
+    if not sample:
+        return 0
+    return sum(measure(item) for item in sample) * length // len(sample)
+
+
+class _CacheEntry:
+    __slots__ = ("value", "loaded_at", "expires_at", "stale_until", "size", "blob")
+
+    def __init__(self, value, loaded_at, expires_at, stale_until, size=0):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+        # The pickled value, filled in by SQLiteBackend.prepare().
+        self.blob = None
+
+
+class MemoryBackend:
+    """Per-process LRU entry store; the default backend."""
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, max_entries=_DEFAULT_MAX_ENTRIES, max_bytes=_DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
         self._lock = Lock()
 
     def get(self, key):
-        now = time.monotonic()
         with self._lock:
             entry = self._entries.get(key)
-            if not entry:
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def prepare(self, entry):
+        """Size entry ahead of set(); runs outside the cache lock."""
+        entry.size = estimate_size(entry.value)
+
+    def set(self, key, entry):
+        """Store a prepared entry and return the keys evicted to stay within the limits."""
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+
+            evicted = []
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                evicted_key, evicted_entry = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_entry.size
+                evicted.append(evicted_key)
+
+            return evicted
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def pop(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def sweep(self, now):
+        """Drop every entry past its hard bound and return how many were removed."""
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.stale_until <= now]
+            for key in expired:
+                self._pop(key)
+            return len(expired)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def bytes_by_namespace(self):
+        totals = defaultdict(int)
+        with self._lock:
+            for key, entry in self._entries.items():
+                totals[key_namespace(key)] += entry.size
+        return dict(totals)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Entry store in a SQLite file shared by every process that opens it.
+
+    Timestamps use wall-clock time so they stay meaningful across processes.
+    Once the store holds more than max_entries rows or max_bytes of pickled
+    values, the least recently read entries are dropped on write.
+
+    Each process keeps the values it has decoded, keyed by their loaded_at,
+    and only unpickles a row again once another process has replaced it. A
+    hit therefore returns the same object every time, with whatever lookup
+    memos (e.g. JobTable filters) it has built. The read time used for LRU
+    eviction is written at most every _ACCESS_WRITE_INTERVAL seconds.
+
+    Every thread has its own connection, so a thread waiting on another
+    process's write lock holds up only itself.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, path, max_entries=_DEFAULT_MAX_ENTRIES, max_bytes=_DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = local()
+        # key -> (loaded_at, value, size), least recently used first.
+        self._decoded = OrderedDict()
+        self._decoded_bytes = 0
+        self._decoded_lock = Lock()
+
+    def _decoded_value(self, key, loaded_at):
+        """Return the value this process decoded for key at loaded_at, or None."""
+        with self._decoded_lock:
+            decoded = self._decoded.get(key)
+            if decoded is None or decoded[0] != loaded_at:
                 return None
+            self._decoded.move_to_end(key)
+            return decoded
+
+    def _remember(self, key, loaded_at, value, size):
+        with self._decoded_lock:
+            self._forget_locked(key)
+            self._decoded[key] = (loaded_at, value, size)
+            self._decoded_bytes += size
+            while len(self._decoded) > 1 and (
+                len(self._decoded) > self.max_entries or self._decoded_bytes > self.max_bytes
+            ):
+                _key, (_loaded_at, _value, evicted_size) = self._decoded.popitem(last=False)
+                self._decoded_bytes -= evicted_size
+
+    def _forget(self, key):
+        with self._decoded_lock:
+            self._forget_locked(key)
+
+    def _forget_locked(self, key):
+        decoded = self._decoded.pop(key, None)
+        if decoded is not None:
+            self._decoded_bytes -= decoded[2]
 
-            expires_at, value = entry
-            if expires_at <= now:
-                self._entries.pop(key, None)
+    def _connect(self):
+        # Connections must not cross a fork, and Passenger forks after import.
+        thread_state = self._local
+        if getattr(thread_state, "connection", None) is not None and thread_state.pid == os.getpid():
+            return thread_state.connection
+
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        # The file only holds cached data, so an older layout is simply rebuilt.
+        if connection.execute("PRAGMA user_version").fetchone()[0] != _SQLITE_SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS cache_entries")
+            connection.execute(f"PRAGMA user_version = {_SQLITE_SCHEMA_VERSION}")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key_text TEXT PRIMARY KEY,
+                key_blob BLOB NOT NULL,
+                namespace TEXT NOT NULL,
+                value_blob BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                loaded_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        os.chmod(self.path, 0o600)
+        thread_state.connection = connection
+        thread_state.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        connection = self._connect()
+        key_text = repr(key)
+        row = connection.execute(
+            "SELECT loaded_at, expires_at, stale_until, size, accessed_at FROM cache_entries WHERE key_text = ?",
+            (key_text,),
+        ).fetchone()
+        if row is None:
+            self._forget(key)
+            return None
+
+        loaded_at, expires_at, stale_until, size, accessed_at = row
+        now = self.clock()
+        if now - accessed_at >= _ACCESS_WRITE_INTERVAL:
+            connection.execute("UPDATE cache_entries SET accessed_at = ? WHERE key_text = ?", (now, key_text))
+
+        decoded = self._decoded_value(key, loaded_at)
+        if decoded is not None:
+            value = decoded[1]
+        else:
+            row = connection.execute(
+                "SELECT value_blob FROM cache_entries WHERE key_text = ? AND loaded_at = ?", (key_text, loaded_at)
+            ).fetchone()
+            if row is None:
+                # Replaced or dropped by another process since the first read.
                 return None
+            value = pickle.loads(row[0])
+            self._remember(key, loaded_at, value, size)
 
-            return value
+        return _CacheEntry(value, loaded_at, expires_at, stale_until, size)
+
+    def prepare(self, entry):
+        """Pickle entry ahead of set(); runs outside the cache lock."""
+        entry.blob = pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+        entry.size = len(entry.blob)
+
+    def set(self, key, entry):
+        """Store a prepared entry and return the keys evicted to stay within the limits."""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    repr(key),
+                    pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL),
+                    key_namespace(key),
+                    entry.blob,
+                    entry.size,
+                    entry.loaded_at,
+                    entry.expires_at,
+                    entry.stale_until,
+                    entry.loaded_at,
+                ),
+            )
+            evicted = self._enforce_limits(connection, repr(key))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._remember(key, entry.loaded_at, entry.value, entry.size)
+        for evicted_key in evicted:
+            self._forget(evicted_key)
+        return evicted
+
+    def _enforce_limits(self, connection, keep_key_text):
+        count, total_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return []
+
+        evicted = []
+        for key_text, key_blob, size in connection.execute(
+            "SELECT key_text, key_blob, size FROM cache_entries WHERE key_text != ? ORDER BY accessed_at",
+            (keep_key_text,),
+        ).fetchall():
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM cache_entries WHERE key_text = ?", (key_text,))
+            evicted.append(pickle.loads(key_blob))
+            count -= 1
+            total_bytes -= size
+
+        return evicted
+
+    def pop(self, key):
+        self._forget(key)
+        self._connect().execute("DELETE FROM cache_entries WHERE key_text = ?", (repr(key),))
+
+    def sweep(self, now):
+        """Drop every entry past its hard bound and return how many were removed."""
+        return self._connect().execute("DELETE FROM cache_entries WHERE stale_until <= ?", (now,)).rowcount
+
+    def keys(self):
+        rows = self._connect().execute("SELECT key_blob FROM cache_entries").fetchall()
+        return [pickle.loads(key_blob) for (key_blob,) in rows]
+
+    def bytes_by_namespace(self):
+        rows = self._connect().execute(
+            "SELECT namespace, SUM(size) FROM cache_entries GROUP BY namespace"
+        ).fetchall()
+        return dict(rows)
 
-    def set(self, key, value, ttl_seconds):
-        if ttl_seconds <= 0:
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+def _private_cache_dir():
+    """Return a per-user directory under the temp dir that only the user can access."""
+    user = os.getenv("USER") or str(os.getuid())
+    path = os.path.join(tempfile.gettempdir(), f"hpcmosaic-{user}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    details = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or details.st_uid != os.getuid():
+        raise OSError(f"Refusing to use cache directory not owned by the current user: {path}")
+    if details.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+    return path
+
+
+def create_backend(settings, filename):
+    """
+    Build a backend from the `shared_cache` config block.
+
+    Falls back to MemoryBackend when sharing is disabled or the store cannot
+    be opened, so a broken tmp dir never takes the API down. The size limits
+    apply to either backend.
+    """
+    settings = settings or {}
+    max_entries = settings.get("max_entries", _DEFAULT_MAX_ENTRIES)
+    max_bytes = settings.get("max_bytes", _DEFAULT_MAX_BYTES)
+    if not settings.get("enabled"):
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+
+    try:
+        directory = settings.get("directory") or _private_cache_dir()
+        backend = SQLiteBackend(os.path.join(directory, filename), max_entries=max_entries, max_bytes=max_bytes)
+        backend._connect()
+        return backend
+    except (OSError, sqlite3.Error) as e:
+        logging.warning("Shared cache unavailable, using per-process cache: %s", e)
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+
+
+class _PendingLoad:
+    """Result slot shared by every caller waiting on one in-flight loader."""
+
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+        self.loaded_at = None
+        # The key's generation when the load started; see TTLCache._generations.
+        self.generation = 0
+
+
+class TTLCache:
+    def __init__(self, backend=None):
+        self._backend = backend if backend is not None else MemoryBackend()
+        self._pending = {}
+        # Bumped when a key is invalidated while its load is in flight, so a
+        # result read before the invalidation is not stored afterwards. Only
+        # keys invalidated mid-load get an entry.
+        self._generations = defaultdict(int)
+        # Guards only the in-flight loads, generations and counters. Backends
+        # are thread-safe on their own and are called outside it, so a slow
+        # read or write (unpickling, a SQLite lock held by another process)
+        # holds up only the callers of that key.
+        self._lock = Lock()
+        self._last_sweep = self._backend.clock()
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def use_backend(self, backend):
+        """Swap the entry store. Entries held by the previous backend are dropped."""
+        with self._lock:
+            self._backend = backend
+            self._last_sweep = backend.clock()
+
+    def _count(self, key, counter):
+        self._counters[key_namespace(key)][counter] += 1
+
+    def _get_entry(self, key, now):
+        """Return the entry for key, dropping it once it is past its hard bound."""
+        entry = self._backend.get(key)
+        if entry is not None and entry.stale_until <= now:
+            self._backend.pop(key)
+            return None
+
+        return entry
+
+    def _sweep_due(self, now):
+        # Expired entries are otherwise only dropped when their own key is read.
+        if now - self._last_sweep < _SWEEP_INTERVAL:
+            return False
+
+        self._last_sweep = now
+        return True
+
+    def get(self, key):
+        now = self._backend.clock()
+        entry = self._get_entry(key, now)
+        with self._lock:
+            if entry is None or entry.expires_at <= now:
+                self._count(key, "misses")
+                return None
+
+            self._count(key, "hits")
+            return entry.value
+
+    def contains(self, key):
+        """Return True when key holds a fresh or stale value, without counting a hit or miss."""
+        return self._get_entry(key, self._backend.clock()) is not None
+
+    def set(self, key, value, ttl_seconds, max_stale_seconds=0):
+        return self._store(key, value, ttl_seconds, max_stale_seconds)
+
+    def _store(self, key, value, ttl_seconds, max_stale_seconds, pending=None):
+        """Store value; with pending, skip it when key was invalidated since that load began."""
+        if ttl_seconds is not None and ttl_seconds <= 0:
             return value
 
+        # Sizing or pickling a large value is slow, so it happens before taking the lock.
+        backend = self._backend
+        entry = _CacheEntry(value, 0, 0, 0)
+        backend.prepare(entry)
+
         with self._lock:
-            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            if pending is not None and self._generations.get(key, 0) != pending.generation:
+                self._count(key, "discarded")
+                return value
 
+            now = backend.clock()
+            sweep = self._sweep_due(now)
+
+        entry.loaded_at = now
+        entry.expires_at = float("inf") if ttl_seconds is None else now + ttl_seconds
+        entry.stale_until = entry.expires_at + max(0, max_stale_seconds)
+        evicted = backend.set(key, entry)
+
+        with self._lock:
+            for evicted_key in evicted:
+                self._count(evicted_key, "evictions")
+            # The write ran outside the lock, so check again for an
+            # invalidation that arrived while it was in progress.
+            invalidated = pending is not None and self._generations.get(key, 0) != pending.generation
+            if invalidated:
+                self._count(key, "discarded")
+            elif pending is not None:
+                pending.loaded_at = now
+
+        if invalidated:
+            backend.pop(key)
+        if sweep:
+            backend.sweep(now)
         return value
 
-    def get_or_set(self, key, ttl_seconds, loader):
-        cached = self.get(key)
-        if cached is not None:
-            return cached
+    def _claim(self, key, counter="misses"):
+        """Register the caller as owner or waiter of the in-flight load for key."""
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingLoad()
+            pending.generation = self._generations.get(key, 0)
+            self._pending[key] = pending
+            self._count(key, counter)
+            return pending, True
+
+        pending.waiters += 1
+        self._count(key, "coalesced")
+        return pending, False
+
+    def _run_loader(self, key, pending, ttl_seconds, max_stale_seconds, loader):
+        try:
+            value = loader()
+            pending.value = self._store(key, value, ttl_seconds, max_stale_seconds, pending)
+            return value
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            # The entry is stored before the pending slot is released, so a
+            # caller that reads the backend after this finds the value.
+            with self._lock:
+                # An invalidation may have handed the key to a newer load.
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+            pending.done.set()
+
+            if pending.waiters:
+                logging.debug("Coalesced %d cache callers for %r", pending.waiters, key)
+
+    def _refresh_in_background(self, key, pending, ttl_seconds, max_stale_seconds, loader):
+        def _refresh():
+            try:
+                self._run_loader(key, pending, ttl_seconds, max_stale_seconds, loader)
+            except Exception as e:
+                # The stale value stays available until its hard bound expires.
+                logging.warning("Background cache refresh failed for %r: %s", key, e)
+
+        Thread(target=_refresh, name="ttlcache-refresh", daemon=True).start()
+
+    def lookup(self, key, ttl_seconds, loader, max_stale_seconds=0):
+        """
+        Return a CacheResult for key, loading it when missing.
+
+        With max_stale_seconds > 0 an expired value is returned immediately
+        (stale=True) and reloaded on a background thread.
+
+        The backend is read outside the lock, so backend I/O never blocks
+        other keys. A caller that missed just before another load stored its
+        value may run one more load.
+        """
+        now = self._backend.clock()
+        entry = self._get_entry(key, now)
+
+        with self._lock:
+            if entry is not None:
+                age = max(0.0, now - entry.loaded_at)
+                self._count(key, "hits")
+                if entry.expires_at > now:
+                    return CacheResult(entry.value, age, False, entry.loaded_at)
+
+                self._count(key, "stale_hits")
+                if key not in self._pending:
+                    # Already counted as a hit, so the claim is not a miss.
+                    pending, _ = self._claim(key, counter="background_refreshes")
+                    self._refresh_in_background(key, pending, ttl_seconds, max_stale_seconds, loader)
+                return CacheResult(entry.value, age, True, entry.loaded_at)
 
-        value = loader()
-        return self.set(key, value, ttl_seconds)
+            pending, is_owner = self._claim(key)
+
+        if not is_owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return CacheResult(pending.value, 0.0, False, pending.loaded_at)
+
+        value = self._run_loader(key, pending, ttl_seconds, max_stale_seconds, loader)
+        return CacheResult(value, 0.0, False, pending.loaded_at)
+
+    def prefetch(self, key, ttl_seconds, loader, max_stale_seconds=0, lead_seconds=0):
+        """
+        Reload key when it is missing or expires within lead_seconds.
+
+        Returns True when the loader ran. A load already in flight for the key
+        is left to finish instead of starting another.
+        """
+        now = self._backend.clock()
+        entry = self._get_entry(key, now)
+        if entry is not None and entry.expires_at - now > lead_seconds:
+            return False
+
+        with self._lock:
+            if key in self._pending:
+                return False
+
+            pending, _ = self._claim(key, counter="prefetches")
+
+        self._run_loader(key, pending, ttl_seconds, max_stale_seconds, loader)
+        return True
+
+    def get_or_set(self, key, ttl_seconds, loader, max_stale_seconds=0):
+        return self.lookup(key, ttl_seconds, loader, max_stale_seconds).value
 
     def invalidate_matching(self, predicate):
+        """
+        Drop every entry whose key matches predicate and return how many were
+        dropped. Loads of matching keys already in flight still answer their
+        callers but do not store their result.
+        """
         with self._lock:
-            keys = [key for key in self._entries if predicate(key)]
-            for key in keys:
-                self._entries.pop(key, None)
+            # Callers arriving from now on start a fresh load instead of
+            # waiting for one that may have read the old state.
+            for key in [key for key in self._pending if predicate(key)]:
+                self._generations[key] += 1
+                del self._pending[key]
+
+        keys = [key for key in self._backend.keys() if predicate(key)]
+        for key in keys:
+            self._backend.pop(key)
 
         return len(keys)
+
+    def stats(self):
+        """
+        Return counters since the process started, grouped by key namespace.
+
+        Counters are per process even with a shared backend; entry counts and
+        byte estimates describe the backend itself.
+        """
+        backend = self._backend
+        bytes_by_namespace = backend.bytes_by_namespace()
+        entries = len(backend)
+
+        with self._lock:
+            namespaces = {}
+            for namespace in sorted(set(self._counters) | set(bytes_by_namespace)):
+                counters = self._counters[namespace]
+                namespaces[namespace] = {
+                    "hits": counters["hits"],
+                    "misses": counters["misses"],
+                    "stale_hits": counters["stale_hits"],
+                    "coalesced": counters["coalesced"],
+                    "background_refreshes": counters["background_refreshes"],
+                    "prefetches": counters["prefetches"],
+                    "evictions": counters["evictions"],
+                    "discarded": counters["discarded"],
+                    "estimated_bytes": bytes_by_namespace.get(namespace, 0),
+                }
+            in_flight = len(self._pending)
+
+        return {
+            "backend": type(backend).__name__,
+            "entries": entries,
+            "max_entries": backend.max_entries,
+            "max_bytes": backend.max_bytes,
+            "in_flight": in_flight,
+            "namespaces": namespaces,
+        }
@@ -0,0 +1,217 @@
+"""
+Shared, cached snapshot of cluster node state.
+
+One `scontrol --oneliner show nodes` per refresh interval is parsed into a
+NodeTable, and every node route is served from it: /nodes, /node/<name>,
+/gpu-resources and /cpuavail in info.py and /utilization in jobs.py. Counting
+is done in Python over the parsed records instead of one pestat, sinfo or
+cpuavail pipeline per number, and opening a node's detail view costs no extra
+subprocess.
+
+The queue table from retrieve_sinfo is cached next to it under the same
+refresh interval, read as a Python literal rather than evaluated. The node
+type labels of the site cpuavail script have no scontrol equivalent, so its
+configuration section is still read, but only once an hour.
+"""
+import ast
+import hashlib
+
+from . import api
+from .cache import TTLCache, create_backend
+from .utils import iter_scontrol_records, run_process_output, safe_int, stream_process_lines
+
+_NODES_KEY = ("scontrol-nodes",)
+_NODES_COMMAND = ["scontrol", "--oneliner", "show", "nodes"]
+_SCHEDULABLE_STATES = ("allocated", "mixed", "idle")
+_SINFO_KEY = ("retrieve-sinfo",)
+_SINFO_COMMAND = ["/sw/local/bin/retrieve_sinfo"]
+_CPUAVAIL_KEY = ("cpuavail-configuration",)
+_CPUAVAIL_COMMAND = ["/sw/local/bin/cpuavail"]
+# Node types and counts only change when hardware is added or retired.
+_CPUAVAIL_REFRESH_INTERVAL = 3600
+
+_cluster_cache = TTLCache()
+_snapshot_settings = {"refresh_interval": 20, "max_stale": 60}
+
+
+@api.record_once
+def _configure_cluster_cache(state):
+    """Apply the `shared_cache` and `node_snapshot` settings once the app config is known."""
+    _cluster_cache.use_backend(create_backend(state.app.config.get("shared_cache"), "cluster-cache.sqlite3"))
+
+    settings = state.app.config.get("node_snapshot") or {}
+    refresh_interval = safe_int(settings.get("refresh_interval"))
+    if refresh_interval:
+        _snapshot_settings["refresh_interval"] = refresh_interval
+        _snapshot_settings["max_stale"] = 3 * refresh_interval
+
+
+def normalize_slurm_node_state(state):
+    value = str(state or "").lower().replace("*", "").replace("+", "").replace("#", "").replace("-", "")
+
+    if "down" in value or "drain" in value or "fail" in value:
+        return "down"
+    if "maint" in value or "reserv" in value:
+        return "maintenance"
+    if "mix" in value:
+        return "mixed"
+    if "alloc" in value or "comp" in value:
+        return "allocated"
+    if "idle" in value:
+        return "idle"
+    return "unknown"
+
+
+def sinfo_node_state(state):
+    """Translate scontrol's State (e.g. MIXED+DRAIN, IDLE*) into sinfo's %T long form."""
+    base, *flags = str(state or "unknown").upper().split("+")
+    not_responding = "*" in base
+    base = base.replace("*", "").lower()
+
+    if base == "down":
+        long_state = "down"
+    elif "DRAIN" in flags:
+        long_state = "drained" if base == "idle" else "draining"
+    elif "MAINT" in flags:
+        long_state = "maint"
+    elif "RESERVED" in flags:
+        long_state = "reserved"
+    elif "COMPLETING" in flags:
+        long_state = "completing"
+    elif "FAIL" in flags:
+        long_state = "failing"
+    else:
+        long_state = base
+
+    return f"{long_state}*" if not_responding else long_state
+
+
+def node_partitions(node):
+    return [partition.strip() for partition in (node.get("Partitions") or "").split(",") if partition.strip()]
+
+
+class NodeTable:
+    """Parsed `scontrol --oneliner show nodes` records indexed by name, partition and state."""
+
+    def __init__(self, lines):
+        self.nodes = []
+        self._by_name = {}
+        self._by_partition = {}
+        self._by_state = {}
+
+        for node in iter_scontrol_records(lines):
+            name = node.get("NodeName")
+            if not name:
+                continue
+
+            self.nodes.append(node)
+            self._by_name[name] = node
+            for partition in node_partitions(node):
+                self._by_partition.setdefault(partition.rstrip("*").lower(), []).append(node)
+            self._by_state.setdefault(normalize_slurm_node_state(node.get("State")), []).append(node)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def in_partition(self, partition):
+        return self._by_partition.get(str(partition or "").rstrip("*").lower(), [])
+
+    def in_state(self, state):
+        """Return nodes whose normalize_slurm_node_state() equals state."""
+        return self._by_state.get(state, [])
+
+
+def get_node_table():
+    """Return a CacheResult holding the current NodeTable."""
+    return _cluster_cache.lookup(
+        _NODES_KEY,
+        _snapshot_settings["refresh_interval"],
+        lambda: NodeTable(stream_process_lines(_NODES_COMMAND)),
+        max_stale_seconds=_snapshot_settings["max_stale"],
+    )
+
+
+def _load_sinfo_queues():
+    output = run_process_output(_SINFO_COMMAND).strip()
+    try:
+        queues = ast.literal_eval(output)
+    except (SyntaxError, ValueError):
+        raise RuntimeError("Unexpected output format from retrieve_sinfo")
+
+    if not isinstance(queues, list):
+        raise RuntimeError("Unexpected output format from retrieve_sinfo")
+
+    # Tagged from the tool's output so an unchanged queue table keeps its ETag
+    # across refreshes and processes.
+    return {"queues": queues, "etag": hashlib.sha256(output.encode("utf-8")).hexdigest()}
+
+
+def get_sinfo_queues():
+    """Return a CacheResult holding {"queues": [...], "etag": str} from retrieve_sinfo."""
+    return _cluster_cache.lookup(
+        _SINFO_KEY,
+        _snapshot_settings["refresh_interval"],
+        _load_sinfo_queues,
+        max_stale_seconds=_snapshot_settings["max_stale"],
+    )
+
+
+def _load_node_configuration():
+    lines = run_process_output(_CPUAVAIL_COMMAND).strip().split("\n")
+
+    config_start = next((i for i, l in enumerate(lines) if "CONFIGURATION" in l), -1)
+    avail_start  = next((i for i, l in enumerate(lines) if "AVAILABILITY"  in l), -1)
+
+    if config_start == -1 or avail_start == -1:
+        raise RuntimeError("Unexpected output format from cpuavail")
+
+    config_data = []
+
+    for line in lines[config_start + 3: avail_start - 1]:
+        parts = line.split()
+
+        if len(parts) == 2:
+            config_data.append({"node_type": parts[0], "node_count": int(parts[1])})
+
+    return config_data
+
+
+def get_node_configuration():
+    """Return a CacheResult holding cpuavail's [{"node_type", "node_count"}, ...] rows."""
+    return _cluster_cache.lookup(
+        _CPUAVAIL_KEY,
+        _CPUAVAIL_REFRESH_INTERVAL,
+        _load_node_configuration,
+        max_stale_seconds=3 * _CPUAVAIL_REFRESH_INTERVAL,
+    )
+
+
+def summarize_utilization(table):
+    """
+    Count allocated, mixed and idle nodes and their cores.
+
+    Matches what `pestat -s alloc,mix,idle` covered: nodes that are down,
+    draining or in maintenance are left out of both the node and core totals.
+    """
+    node_counts = {}
+    allocated_cpus = 0
+    total_cpus = 0
+
+    for state in _SCHEDULABLE_STATES:
+        nodes = table.in_state(state)
+        node_counts[state] = len(nodes)
+        for node in nodes:
+            allocated_cpus += safe_int(node.get("CPUAlloc"), 0)
+            total_cpus += safe_int(node.get("CPUTot"), 0)
+
+    return {
+        "nodes": {"allocated": node_counts["allocated"], "mixed": node_counts["mixed"], "idle": node_counts["idle"]},
+        "cores": {"allocated": allocated_cpus, "idle": total_cpus - allocated_cpus},
+    }
+
+
+def cache_stats():
+    return _cluster_cache.stats()
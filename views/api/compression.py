@@ -0,0 +1,165 @@
+"""
+Response compression for the API blueprint.
+
+JSON responses above `min_size` bytes are sent with brotli (when the brotli
+package is installed) or gzip, whichever the client's Accept-Encoding
+prefers. Bodies sent with `json_bytes_response` carry a version ETag that
+names their exact bytes, so their compressed form is kept per (ETag,
+encoding): a payload that only changes with its version, like the module
+catalog, is compressed once and every later request for it is served from
+the stored bytes, without being serialized again (see
+`precompressed_response`). Other responses are compressed on every request,
+since their ETags may leave out fields such as the `cache` age.
+"""
+import gzip
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app, request
+
+from . import api
+from .utils import safe_int
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+_COMPRESSIBLE_MIMETYPES = {"application/json"}
+
+_compression_settings = {
+    "enabled": True,
+    "min_size": 1024,
+    "gzip_level": 6,
+    "brotli_quality": 5,
+    "cache_max_bytes": 64 * 1024 * 1024,
+}
+
+
+class _CompressedBodies:
+    """Byte-bounded LRU of compressed bodies keyed by (etag, encoding)."""
+
+    def __init__(self):
+        self._bodies = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        max_bytes = _compression_settings["cache_max_bytes"]
+        if len(body) > max_bytes:
+            return
+
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._bodies[key] = body
+            self._bytes += len(body)
+            while self._bytes > max_bytes:
+                _key, evicted = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+_compressed_bodies = _CompressedBodies()
+
+
+@api.record_once
+def _configure_compression(state):
+    """Apply the `response_compression` settings once the app config is known."""
+    settings = state.app.config.get("response_compression") or {}
+    if "enabled" in settings:
+        _compression_settings["enabled"] = bool(settings["enabled"])
+
+    for key in ("min_size", "gzip_level", "brotli_quality", "cache_max_bytes"):
+        value = safe_int(settings.get(key))
+        if value is not None:
+            _compression_settings[key] = value
+
+
+def negotiate_encoding():
+    """Return "br", "gzip" or None for the current request's Accept-Encoding."""
+    if not _compression_settings["enabled"]:
+        return None
+
+    accepted = request.accept_encodings
+    candidates = [("gzip", accepted.quality("gzip"))]
+    if brotli is not None:
+        # Listed first so brotli wins a tie.
+        candidates.insert(0, ("br", accepted.quality("br")))
+
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=_compression_settings["brotli_quality"])
+    return gzip.compress(data, compresslevel=_compression_settings["gzip_level"], mtime=0)
+
+
+def _mark_encoded(response, body, encoding, etag):
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if etag:
+        # The encoded bytes differ from the identity body, so the tag is weak.
+        response.set_etag(etag, weak=True)
+
+
+def precompressed_response(etag, mimetype="application/json"):
+    """
+    Return a response built from the stored compressed body for `etag` in
+    the encoding this request accepts, or None when nothing is stored yet.
+    """
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return None
+
+    body = _compressed_bodies.get((etag, encoding))
+    if body is None:
+        return None
+
+    response = current_app.response_class(mimetype=mimetype)
+    _mark_encoded(response, body, encoding, etag)
+    return response
+
+
+@api.after_request
+def _compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in _COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < _compression_settings["min_size"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    versioned = getattr(response, "version_tagged", False)
+    key = (etag, encoding) if versioned and etag and not weak else None
+    body = _compressed_bodies.get(key) if key else None
+    if body is None:
+        body = _compress(data, encoding)
+        if key:
+            _compressed_bodies.set(key, body)
+
+    _mark_encoded(response, body, encoding, etag)
+    return response
@@ -0,0 +1,71 @@
+"""
+Conditional GET support shared by the read-only API routes.
+
+`conditional_get` tags successful GET responses with an ETag, answers a
+matching If-None-Match with an empty 304 and sets the route's Cache-Control.
+Routes whose data has a cheap version (the module catalog's file signature,
+the sinfo output hash, the load time of a cached Slurm snapshot) tag the
+response themselves and call `not_modified` first, so an unchanged payload is
+not even serialized; bodies encoded once per version are sent with
+`json_bytes_response`. Everything else gets a hash of its JSON body.
+"""
+import hashlib
+from functools import wraps
+
+from flask import current_app, request
+
+
+def version_etag(*parts):
+    """Build an ETag from the parts that identify a payload's version."""
+    return hashlib.sha1("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def not_modified(etag, weak=False):
+    """Return a 304 response when the client already holds `etag`, else None."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag, weak=weak)
+    return response
+
+
+def json_bytes_response(body, etag):
+    """Send already-encoded JSON bytes tagged with their version ETag."""
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Same version, same bytes: lets compression reuse its encoded body.
+    response.version_tagged = True
+    return response
+
+
+def conditional_get(max_age=0):
+    """
+    Decorate a GET route with ETag revalidation and Cache-Control.
+
+    `max_age` is how many seconds the browser may reuse the response without
+    asking; 0 means it must revalidate every time (`no-cache`). Responses are
+    always `private`, since most carry the current user's data.
+    Error responses are passed through untouched.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(view(*args, **kwargs))
+            if request.method not in ("GET", "HEAD") or response.status_code not in (200, 304):
+                return response
+
+            if response.status_code == 200 and not response.is_streamed and "ETag" not in response.headers:
+                response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+
+            response.cache_control.private = True
+            if max_age:
+                response.cache_control.max_age = max_age
+            else:
+                response.cache_control.no_cache = True
+
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
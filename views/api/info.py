@@ -11,9 +11,11 @@ import logging
 from datetime import datetime
 from flask import jsonify
 from . import api
+from .cluster import get_node_configuration, get_node_table, get_sinfo_queues, node_partitions, normalize_slurm_node_state, sinfo_node_state
+from .http_cache import conditional_get, json_bytes_response, not_modified
+from .serialization import SerializedPayloads
 from .utils import (
     get_user_email,
-    parse_key_value_tokens,
     parse_storage_to_mib,
     percentage,
     run_process_output,
@@ -28,6 +30,7 @@ QUOTA_EXPIRATION_LINE = re.compile(
     r"will expire on (?P<date>.+?)\s*$"
 )
 QUOTA_EXPIRATION_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%Y-%m-%d")
+_serialized_payloads = SerializedPayloads()
 
 
 def _normalize_quota_expiration(value):
@@ -43,30 +46,6 @@ def _validate_node_name(node_name):
     return bool(SAFE_NODE_NAME.fullmatch(node_name or ""))
 
 
-def _normalize_partition_name(partition):
-    return str(partition or "").strip().rstrip("*").lower()
-
-
-def _is_gpu_partition_member(partitions):
-    return any(_normalize_partition_name(partition) == GPU_PARTITION for partition in partitions)
-
-
-def _normalize_slurm_node_state(state):
-    value = str(state or "").lower().replace("*", "").replace("+", "").replace("#", "").replace("-", "")
-
-    if "down" in value or "drain" in value or "fail" in value:
-        return "down"
-    if "maint" in value or "reserv" in value:
-        return "maintenance"
-    if "mix" in value:
-        return "mixed"
-    if "alloc" in value or "comp" in value:
-        return "allocated"
-    if "idle" in value:
-        return "idle"
-    return "unknown"
-
-
 def _parse_gpu_tres_count(value):
     if not value:
         return 0
@@ -80,34 +59,8 @@ def _parse_gpu_tres_count(value):
     return sum(int(count) for count in gres_counts)
 
 
-def _parse_scontrol_nodes_output(output):
-    nodes = []
-    current = {}
-
-    for token in output.split():
-        if "=" not in token:
-            continue
-
-        key, value = token.split("=", 1)
-        if key == "NodeName" and current:
-            nodes.append(current)
-            current = {}
-        current[key] = value
-
-    if current:
-        nodes.append(current)
-
-    return nodes
-
-
-def _get_scontrol_value(output, key):
-    match = re.search(rf"(?:^|\s){re.escape(key)}=(.*?)(?=\s+\S+=|\s*$)", output, re.DOTALL)
-    return match.group(1).strip() if match else None
-
-
-def _parse_scontrol_node_output(output):
-    node_info = parse_key_value_tokens(output)
-
+def _parse_scontrol_node_output(node_info):
+    """Shape one parsed scontrol node record for the node detail view."""
     partitions = node_info.get("Partitions") or ""
     partitions = [partition.strip() for partition in partitions.split(",") if partition.strip()]
 
@@ -131,9 +84,9 @@ def _parse_scontrol_node_output(output):
         "boot_time": node_info.get("BootTime"),
         "slurmd_start_time": node_info.get("SlurmdStartTime"),
         "version": node_info.get("Version"),
-        "reason": _get_scontrol_value(output, "Reason"),
-        "reason_user": _get_scontrol_value(output, "ReasonUid"),
-        "reason_time": _get_scontrol_value(output, "ReasonTime"),
+        "reason": node_info.get("Reason"),
+        "reason_user": node_info.get("ReasonUid"),
+        "reason_time": node_info.get("ReasonTime"),
         "configured_tres": node_info.get("CfgTRES"),
         "allocated_tres": node_info.get("AllocTRES"),
     }
@@ -180,21 +133,23 @@ def get_user_data():
 
 
 @api.route('/sinfo', methods=['GET'])
+@conditional_get()
 def get_sinfo():
+    """Per-queue CPU and node availability from retrieve_sinfo, with ETag revalidation."""
     try:
-        result = subprocess.check_output(
-            "/sw/local/bin/retrieve_sinfo", shell=True, stderr=subprocess.STDOUT
+        sinfo = get_sinfo_queues().value
+
+        # Unchanged queue state is answered without serializing it again.
+        return not_modified(sinfo["etag"]) or json_bytes_response(
+            _serialized_payloads.get("sinfo", sinfo["etag"], lambda: sinfo["queues"]), sinfo["etag"]
         )
-        output = result.decode("utf-8")
-        return jsonify(eval(output)), 200
 
-    except subprocess.CalledProcessError as e:
-        return jsonify({"error": f"Command failed: {e.output.decode('utf-8')}"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route('/showquota', methods=['GET'])
+@conditional_get(max_age=60)
 def get_quota():
     try:
         result = subprocess.check_output(
@@ -281,6 +236,7 @@ def get_quota():
 
 
 @api.route('/groups', methods=['GET'])
+@conditional_get(max_age=300)
 def get_user_groups():
 
     try:
@@ -295,31 +251,22 @@ def get_user_groups():
 
 @api.route('/nodes', methods=['GET'])
 def get_nodes():
+    """One row per node and partition, in the shape `sinfo -N -o %N|%T|%P` used to return."""
     try:
-        result = subprocess.check_output(
-            ['sinfo', '-N', '-h', '-o', '%N|%T|%P'],
-            universal_newlines=True,
-            stderr=subprocess.STDOUT
-        )
-
         nodes = []
 
-        for line in result.strip().split('\n'):
-            if not line:
-                continue
-
-            name, status, partition = line.split('|', 2)
+        for node in get_node_table().value.nodes:
+            status = sinfo_node_state(node.get("State"))
 
-            nodes.append({
-                'name': name,
-                'status': status,
-                'partition': partition
-            })
+            for partition in node_partitions(node):
+                nodes.append({
+                    'name': node.get("NodeName"),
+                    'status': status,
+                    'partition': partition
+                })
 
         return jsonify(nodes), 200
 
-    except subprocess.CalledProcessError as e:
-        return jsonify({'error': e.output}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -327,25 +274,14 @@ def get_nodes():
 @api.route('/gpu-resources', methods=['GET'])
 def get_gpu_resources():
     try:
-        output = run_process_output(["scontrol", "show", "nodes"])
-
         total_nodes = 0
         busy_nodes = 0
         available_nodes = 0
         total_gpus = 0
         allocated_gpus = 0
 
-        for node in _parse_scontrol_nodes_output(output):
-            partitions = [
-                partition.strip()
-                for partition in (node.get("Partitions") or "").split(",")
-                if partition.strip()
-            ]
-
-            if not _is_gpu_partition_member(partitions):
-                continue
-
-            state = _normalize_slurm_node_state(node.get("State"))
+        for node in get_node_table().value.in_partition(GPU_PARTITION):
+            state = normalize_slurm_node_state(node.get("State"))
             configured_gpus = _parse_gpu_tres_count(node.get("CfgTRES")) or _parse_gpu_tres_count(node.get("Gres"))
             allocated_node_gpus = _parse_gpu_tres_count(node.get("AllocTRES"))
 
@@ -393,11 +329,12 @@ def get_node_detail(node_name):
         return jsonify({"error": "Invalid node name"}), 400
 
     try:
-        output = run_process_output(["scontrol", "show", "node", node_name])
-        node_detail = _parse_scontrol_node_output(output)
-        if not node_detail.get("name"):
+        node_info = get_node_table().value.get(node_name)
+        if node_info is None:
             return jsonify({"error": "Node not found"}), 404
 
+        node_detail = _parse_scontrol_node_output(node_info)
+
         return jsonify(node_detail), 200
 
     except FileNotFoundError:
@@ -440,44 +377,33 @@ def get_node_jobs(node_name):
 
 @api.route('/cpuavail', methods=['GET'])
 def get_cpuavail():
-    try:
-        result = subprocess.check_output(
-            "/sw/local/bin/cpuavail", shell=True, stderr=subprocess.STDOUT
-        )
-
-        lines = result.decode("utf-8").strip().split("\n")
-
-        config_start = next((i for i, l in enumerate(lines) if "CONFIGURATION" in l), -1)
-        avail_start  = next((i for i, l in enumerate(lines) if "AVAILABILITY"  in l), -1)
-
-        if config_start == -1 or avail_start == -1:
-            return jsonify({"error": "Unexpected output format from cpuavail"}), 500
-
-        config_data = []
-
-        for line in lines[config_start + 3: avail_start - 1]:
-            parts = line.split()
-
-            if len(parts) == 2:
-                config_data.append({"node_type": parts[0], "node_count": int(parts[1])})
+    """
+    Node configuration counts and per-node free CPUs and memory (MB).
 
+    The configuration rows keep the site cpuavail script's node type labels;
+    availability comes from the shared node snapshot.
+    """
+    try:
+        config_data = get_node_configuration().value
         availability_data = []
 
-        for line in lines[avail_start + 3:]:
-            parts = line.split()
+        for node in get_node_table().value.nodes:
+            if normalize_slurm_node_state(node.get("State")) not in ("idle", "mixed"):
+                continue
+
+            cpus = safe_int(node.get("CPUTot"), 0)
+            memory = safe_int(node.get("RealMemory"), 0)
 
-            if len(parts) == 3:
+            cpus_available = cpus - safe_int(node.get("CPUAlloc"), 0)
+            if cpus_available > 0:
                 availability_data.append({
-                    "node_name": parts[0],
-                    "cpus_available": int(parts[1]),
-                    "memory_available": int(parts[2]),
+                    "node_name": node.get("NodeName"),
+                    "cpus_available": cpus_available,
+                    "memory_available": memory - safe_int(node.get("AllocMem"), 0),
                 })
 
         return jsonify({"configuration": config_data, "availability": availability_data}), 200
 
-    except subprocess.CalledProcessError as e:
-        return jsonify({"error": f"Command failed: {e.output.decode('utf-8')}"}), 500
-
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,138 @@
+"""
+Append-only local store for a user's parsed sacct history.
+
+The first request for a window runs sacct from the window start; later
+refreshes only ask sacct for jobs active since the previous refresh (minus an
+overlap) and merge them by job id. Long windows such as 90 days or a year
+therefore cost one backfill and then a few seconds of accounting data per
+refresh instead of a full rescan.
+
+The store is a SQLite file next to the user's saved layouts. Timestamps are
+kept in sacct's local ISO format (YYYY-MM-DDTHH:MM:SS), which sorts
+lexically, so window filtering happens in SQL.
+"""
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from .utils import get_layouts_dir
+
+HISTORY_STORE_FILENAME = "_job_history.sqlite3"
+_REFRESH_OVERLAP_SECONDS = 600
+_RETENTION_SECONDS = 400 * 24 * 3600
+_UNFINISHED_END_TIMES = ("", "Unknown", "None")
+
+
+def format_sacct_time(timestamp):
+    """Format epoch seconds the way sacct prints and accepts local times."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class JobHistoryStore:
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_user(cls, user):
+        return cls(os.path.join(get_layouts_dir(user), HISTORY_STORE_FILENAME))
+
+    def _connect(self):
+        # Scratch is a network filesystem, so stay on the default rollback
+        # journal rather than WAL, which needs shared memory between hosts.
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                submit_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                record TEXT NOT NULL
+            )
+            """
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS jobs_end_time ON jobs (end_time)")
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        return connection
+
+    def refresh(self, fetch_since, window_start):
+        """
+        Bring the store up to date for a window starting at window_start.
+
+        fetch_since(starttime) runs sacct from a sacct-formatted start time and
+        returns parsed job records. Returns the number of records merged.
+        """
+        connection = self._connect()
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+            covered_since = meta.get("covered_since")
+            high_water = meta.get("high_water")
+
+            queried_at = time.time()
+            if covered_since is None or high_water is None or window_start < covered_since:
+                # Backfill: nothing stored yet, or the window reaches further back.
+                query_start = window_start
+                covered_since = window_start
+            else:
+                query_start = high_water - _REFRESH_OVERLAP_SECONDS
+
+            records = fetch_since(format_sacct_time(query_start))
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            record["job_id"],
+                            record.get("submit_time") or "",
+                            record.get("end_time") or "",
+                            json.dumps(record, separators=(",", ":")),
+                        )
+                        for record in records
+                    ],
+                )
+                # Jobs sacct never reported an end for (lost from accounting,
+                # or still unfinished at their last refresh) age out by their
+                # submit time instead, so they cannot linger forever.
+                connection.execute(
+                    """
+                    DELETE FROM jobs
+                    WHERE CASE WHEN end_time IN (?, ?, ?) THEN submit_time ELSE end_time END < ?
+                    """,
+                    (*_UNFINISHED_END_TIMES, format_sacct_time(queried_at - _RETENTION_SECONDS)),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [
+                        ("covered_since", max(covered_since, queried_at - _RETENTION_SECONDS)),
+                        ("high_water", queried_at),
+                    ],
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            return len(records)
+        finally:
+            connection.close()
+
+    def jobs_since(self, window_start):
+        """Return stored jobs that were still active at or after window_start."""
+        window_start_text = format_sacct_time(window_start)
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                """
+                SELECT record FROM jobs
+                WHERE end_time IN (?, ?, ?) OR end_time >= ? OR submit_time >= ?
+                ORDER BY submit_time
+                """,
+                (*_UNFINISHED_END_TIMES, window_start_text, window_start_text),
+            ).fetchall()
+        finally:
+            connection.close()
+
+        return [json.loads(record) for (record,) in rows]
@@ -0,0 +1,251 @@
+"""
+Indexed in-memory table of parsed Slurm job records.
+
+One cluster-wide squeue snapshot (or one sacct result) is loaded into a
+JobTable per refresh and every job route derives its view from it, so
+user-scoped and cluster-wide requests no longer run separate commands.
+
+Indexes are built once per table: a hash index per filter field and a
+pre-lowercased search column. The search column is stored as one string so
+substring search runs in str.find rather than a Python loop over every job.
+
+Rows are JobRecord objects rather than dicts: __slots__ avoid a per-job
+hash table and the low-cardinality strings (user, account, partition,
+states) are interned, so a large --allusers result is a fraction of the
+size. Records are turned back into the JSON shape with to_dict() at the
+response boundary.
+"""
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+
+_intern = sys.intern
+
+INDEXED_FIELDS = ("user", "account", "partition", "state")
+SEARCH_FIELDS = ("job_id", "job_name", "user", "account", "partition", "state")
+_ROW_SEPARATOR = "\0"
+
+
+class JobRecord:
+    """
+    One parsed squeue or sacct job.
+
+    Fields a source does not report stay None and are left out of to_dict(),
+    so squeue records keep `reason` and sacct records keep `exit_code` and
+    `end_time`, matching the dicts the routes returned before.
+    """
+
+    __slots__ = (
+        "job_id",
+        "job_name",
+        "user",
+        "account",
+        "partition",
+        "state",
+        "state_raw",
+        "nodes",
+        "cpus",
+        "gpus",
+        "runtime",
+        "time_limit",
+        "submit_time",
+        "reason",
+        "exit_code",
+        "end_time",
+        "source",
+    )
+
+    def __init__(
+        self,
+        job_id=None,
+        job_name=None,
+        user=None,
+        account=None,
+        partition=None,
+        state=None,
+        state_raw=None,
+        nodes=None,
+        cpus=None,
+        gpus=None,
+        runtime=None,
+        time_limit=None,
+        submit_time=None,
+        reason=None,
+        exit_code=None,
+        end_time=None,
+        source=None,
+    ):
+        # Only the low-cardinality strings are interned; unique values such
+        # as job ids, names and timestamps would gain nothing from it.
+        self.job_id = job_id
+        self.job_name = job_name
+        self.user = _intern(user) if user.__class__ is str else user
+        self.account = _intern(account) if account.__class__ is str else account
+        self.partition = _intern(partition) if partition.__class__ is str else partition
+        self.state = _intern(state) if state.__class__ is str else state
+        self.state_raw = _intern(state_raw) if state_raw.__class__ is str else state_raw
+        self.nodes = nodes
+        self.cpus = cpus
+        self.gpus = gpus
+        self.runtime = runtime
+        self.time_limit = _intern(time_limit) if time_limit.__class__ is str else time_limit
+        self.submit_time = submit_time
+        self.reason = reason
+        self.exit_code = exit_code
+        self.end_time = end_time
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{name: values.get(name) for name in cls.__slots__})
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None) if name in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        if name not in self.__slots__ or getattr(self, name) is None:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def to_dict(self):
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        }
+
+
+def _index_value(value):
+    return str(value or "").lower()
+
+
+class JobTable:
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        indexes = {field: defaultdict(list) for field in INDEXED_FIELDS}
+        search_rows = []
+
+        for position, job in enumerate(self.jobs):
+            for field in INDEXED_FIELDS:
+                indexes[field][_index_value(job.get(field))].append(position)
+            search_rows.append(" ".join(_index_value(job.get(field)) for field in SEARCH_FIELDS))
+
+        # Plain dicts, since defaultdicts would grow on every unknown lookup.
+        self._indexes = {field: dict(index) for field, index in indexes.items()}
+        # The table never changes, so unions and membership sets are memoized.
+        self._postings_cache = {}
+        self._set_cache = {}
+        self._filter_cache = {}
+
+        self._search_text = _ROW_SEPARATOR.join(search_rows)
+        self._row_starts = []
+        offset = 0
+        for row in search_rows:
+            self._row_starts.append(offset)
+            offset += len(row) + len(_ROW_SEPARATOR)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def count(self, field, value):
+        return len(self._indexes[field].get(_index_value(value), ()))
+
+    def values(self, field):
+        """Return the distinct lower-cased values of an indexed field."""
+        return list(self._indexes[field])
+
+    def _postings(self, field, value):
+        """Return sorted row positions matching a value or any of a collection of values."""
+        if isinstance(value, (list, tuple, set, frozenset)):
+            values = frozenset(_index_value(item) for item in value)
+        else:
+            values = frozenset([_index_value(value)])
+
+        cache_key = (field, values)
+        postings = self._postings_cache.get(cache_key)
+        if postings is None:
+            lists = [self._indexes[field][item] for item in values if item in self._indexes[field]]
+            if not lists:
+                postings = ()
+            elif len(lists) == 1:
+                postings = lists[0]
+            else:
+                postings = sorted(set().union(*lists))
+            self._postings_cache[cache_key] = postings
+
+        return cache_key, postings
+
+    def _posting_set(self, cache_key, postings):
+        positions = self._set_cache.get(cache_key)
+        if positions is None:
+            positions = self._set_cache[cache_key] = set(postings)
+        return positions
+
+    def _filter_positions(self, filters):
+        """Return sorted matching row positions, or None when nothing is filtered."""
+        postings = [
+            self._postings(field, value)
+            for field, value in filters.items()
+            if value
+        ]
+        if not postings:
+            return None
+
+        postings.sort(key=lambda item: len(item[1]))
+        smallest = postings[0][1]
+        if len(postings) == 1:
+            return smallest
+
+        # Later pages of the same filter reuse the intersection.
+        filter_key = frozenset(cache_key for cache_key, _ in postings)
+        positions = self._filter_cache.get(filter_key)
+        if positions is None:
+            others = [self._posting_set(cache_key, other) for cache_key, other in postings[1:]]
+            positions = [position for position in smallest if all(position in other for other in others)]
+            self._filter_cache[filter_key] = positions
+
+        return positions
+
+    def _search_positions(self, search, candidates):
+        """Return sorted row positions whose search column contains the search text."""
+        matches = []
+        start = self._search_text.find(search)
+        while start != -1:
+            row = bisect_right(self._row_starts, start) - 1
+            matches.append(row)
+            next_row_start = self._row_starts[row + 1] if row + 1 < len(self._row_starts) else len(self._search_text)
+            start = self._search_text.find(search, next_row_start)
+
+        if candidates is None:
+            return matches
+
+        candidate_set = set(candidates)
+        return [position for position in matches if position in candidate_set]
+
+    def select(self, **filters):
+        """
+        Return jobs whose indexed fields equal the given values, case-insensitively.
+
+        Empty filter values are ignored; jobs keep their table order.
+        """
+        return self.query(filters)[0]
+
+    def query(self, filters=None, search="", offset=0, limit=None):
+        """
+        Return (jobs, total) for one page of rows matching filters and search.
+
+        filters maps an indexed field to a value or a collection of accepted
+        values. Without filters or search the page is a plain slice.
+        """
+        positions = self._filter_positions(filters or {})
+
+        search_value = _index_value(search).strip().replace(_ROW_SEPARATOR, "")
+        if search_value:
+            positions = self._search_positions(search_value, positions)
+
+        end = None if limit is None else offset + limit
+        if positions is None:
+            return self.jobs[offset:end], len(self.jobs)
+
+        return [self.jobs[position] for position in positions[offset:end]], len(positions)
@@ -9,12 +9,19 @@ and have no use elsewhere.
 """
 import os
 import re
+import sqlite3
 import subprocess
 import logging
+import time
 from flask import request, jsonify
 from . import api
-from .cache import TTLCache
-from .utils import parse_key_value_tokens, parse_positive_int, run_process_output, safe_int
+from .cache import TTLCache, create_backend
+from .cluster import cache_stats as cluster_cache_stats, get_node_table, summarize_utilization
+from .http_cache import conditional_get, not_modified, version_etag
+from .job_history import JobHistoryStore, format_sacct_time
+from .job_table import JobRecord, JobTable
+from .poller import BackgroundPoller
+from .utils import parse_positive_int, parse_scontrol_record, run_process_output, safe_int, stream_process_lines
 
 _slurm_cache = TTLCache()
 _HISTORICAL_STATES = {"completed", "complete", "failed", "fail", "cancelled", "canceled", "timeout", "history", "historical"}
@@ -22,14 +29,53 @@ _SUMMARY_HISTORY_WINDOW = "24h"
 _DEFAULT_HISTORY_WINDOW = "24h"
 _ACTIVE_LIST_TTL = 10
 _SUMMARY_TTL = 20
-_SACCT_TTL = 300
+# The local history store only asks sacct for recent changes, so it can be
+# refreshed far more often than a full-window sacct query.
+_SACCT_HISTORY_TTL = 60
+_SACCT_BACKFILL_TIMEOUT = 120
+_SACCT_TIMEOUT = 30
+_SACCT_REFRESH_OVERLAP_SECONDS = 600
+_JOB_DETAIL_ACTIVE_TTL = 10
+# Jobs in these states can no longer change; see _job_cache_ttl.
+_FINAL_JOB_STATES = {
+    "Completed", "Failed", "Cancelled", "Timeout",
+    "Out_Of_Memory", "Node_Fail", "Boot_Fail", "Deadline", "Preempted",
+}
+_MAX_JOB_DETAIL_BATCH = 200
+_JOB_ID_PATTERN = re.compile(r"\d+(?:_(?:\d+|\[[\d,%-]+\]))?")
+# `scontrol --oneliner show job` prints one job per line, starting with its id;
+# array tasks also carry the <array job>_<task> id squeue shows.
+_SCONTROL_JOB_IDS = re.compile(r"^JobId=(\d+)(?:.*?\bArrayJobId=(\d+) ArrayTaskId=(\S+))?")
+# <array job>_<task>, which details are also cached under as <array job>_[<task>].
+_ARRAY_TASK_ALIAS = re.compile(r"(\d+)_(\d+)")
+_ALL_USERS_MAX_HISTORY_DAYS = 30
+# Hard bounds on how long past its TTL a value may still be served while it is
+# refreshed in the background (stale-while-revalidate).
+_ACTIVE_LIST_MAX_STALE = 30
+_SUMMARY_MAX_STALE = 60
+_SACCT_MAX_STALE = 900
+
+
+@api.record_once
+def _configure_slurm_cache(state):
+    """Apply the `shared_cache` and `job_poller` settings once the app config is known."""
+    _slurm_cache.use_backend(create_backend(state.app.config.get("shared_cache"), "slurm-cache.sqlite3"))
+
+    settings = state.app.config.get("job_poller") or {}
+    _job_poller.configure(
+        enabled=settings.get("enabled", False),
+        interval=settings.get("interval"),
+        max_interval=settings.get("max_interval"),
+        idle_timeout=settings.get("idle_timeout"),
+    )
+
 
 # ---------------------------------------------------------------------------
 # Output parsers — these translate raw CLI output into structured dicts
 # ---------------------------------------------------------------------------
 
 def _parse_scontrol_output(output):
-    """Parse `scontrol show job <jobid>` output into a flat dict."""
+    """Parse one `scontrol show job` record (multi-line or --oneliner) into a flat dict."""
     job_info = {}
     key_map = {
         "JobId":     "job_id",
@@ -52,7 +98,7 @@ def _parse_scontrol_output(output):
         "WorkDir":   "submit_dir",
     }
 
-    for key, value in parse_key_value_tokens(output).items():
+    for key, value in parse_scontrol_record(output).items():
         if key in key_map:
             job_info[key_map[key]] = value
 
@@ -92,6 +138,19 @@ def _normalize_job_state(state):
     return state_map.get(normalized, normalized.title())
 
 
+def _is_final_job_state(state):
+    return _normalize_job_state(state) in _FINAL_JOB_STATES
+
+
+def _job_cache_ttl(state, active_ttl):
+    """
+    Cache policy for per-job data: finished jobs never change, so they are kept
+    until the cache evicts them (TTL None); anything still pending or running
+    gets active_ttl.
+    """
+    return None if _is_final_job_state(state) else active_ttl
+
+
 def _parse_gpu_count(value):
     if not value or value in {"N/A", "(null)"}:
         return 0
@@ -107,36 +166,66 @@ def _run_slurm_command(command, timeout=20):
     return run_process_output(command, timeout=timeout)
 
 
-def _run_cached_slurm_command(command, ttl_seconds, timeout=20):
-    key = ("slurm-command", tuple(command))
-    return _slurm_cache.get_or_set(
-        key,
-        ttl_seconds,
-        lambda: _run_slurm_command(command, timeout=timeout),
-    )
+def _cache_freshness(*results):
+    """Describe the oldest of several CacheResults for the `cache` response field."""
+    return {
+        "age": round(max((result.age for result in results), default=0.0), 1),
+        "stale": any(result.stale for result in results),
+    }
+
 
+def _snapshot_response(build, *results):
+    """
+    jsonify build() plus the `cache` field under an ETag naming the request
+    and the load times of the cached results it is derived from.
+
+    A revalidation is answered before build() runs and the body is never
+    hashed. The tag is weak because `cache.age` changes under it.
+    """
+    etag = None
+    if all(result.loaded_at is not None for result in results):
+        etag = version_etag(request.full_path, os.getenv("USER"), *(result.loaded_at for result in results))
+        cached = not_modified(etag, weak=True)
+        if cached is not None:
+            return cached
+
+    response = jsonify({**build(), "cache": _cache_freshness(*results)})
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _invalidate_active_job_caches(job_id=None):
+    """
+    Drop cached squeue data and the summary derived from it, and with job_id
+    also the cached scontrol details of that job: its own id, its array-task
+    aliases, and every task of an array when job_id names the whole array.
+    """
+    job_id = str(job_id) if job_id is not None else None
+    array_task = _ARRAY_TASK_ALIAS.fullmatch(job_id or "")
+    detail_ids = {job_id}
+    if array_task:
+        detail_ids.add("{}_[{}]".format(*array_task.groups()))
 
-def _invalidate_active_job_caches():
     def _is_active_job_cache_key(key):
         if not isinstance(key, tuple) or not key:
             return False
+        if key[0] == "job-detail" and job_id is not None:
+            return key[1] in detail_ids or key[1].startswith(f"{job_id}_")
 
-        if key[0] == "jobs-summary":
-            return True
-
-        if key[0] != "slurm-command" or len(key) < 2:
-            return False
-
-        command = key[1]
-        return bool(command) and command[0] == "squeue"
+        return key[0] in {"squeue-snapshot", "jobs-summary"}
 
     return _slurm_cache.invalidate_matching(_is_active_job_cache_key)
 
 
-def _parse_squeue_details(output):
-    jobs = []
+def _iter_output_lines(output):
+    """Accept a command's whole stdout or an iterable of its lines, e.g. from stream_process_lines."""
+    return output.splitlines() if isinstance(output, str) else output
+
 
-    for line in output.splitlines():
+def _iter_squeue_records(output):
+    for line in _iter_output_lines(output):
+        line = line.rstrip("\n")
         if not line.strip():
             continue
 
@@ -160,32 +249,34 @@ def _parse_squeue_details(output):
         ) = fields[:12]
         reason = fields[12] if len(fields) > 12 else ""
 
-        jobs.append({
-            "job_id": job_id,
-            "job_name": job_name,
-            "user": user,
-            "account": account,
-            "partition": partition,
-            "state": _normalize_job_state(state),
-            "state_raw": state,
-            "nodes": safe_int(nodes, 0),
-            "cpus": safe_int(cpus, 0),
-            "gpus": _parse_gpu_count(gpus),
-            "runtime": runtime,
-            "time_limit": time_limit,
-            "submit_time": submit_time,
-            "reason": reason,
-            "source": "squeue",
-        })
-
-    return jobs
-
-
-def _parse_sacct_details(output):
-    jobs = []
+        yield JobRecord(
+            job_id=job_id,
+            job_name=job_name,
+            user=user,
+            account=account,
+            partition=partition,
+            state=_normalize_job_state(state),
+            state_raw=state,
+            nodes=safe_int(nodes, 0),
+            cpus=safe_int(cpus, 0),
+            gpus=_parse_gpu_count(gpus),
+            runtime=runtime,
+            time_limit=time_limit,
+            submit_time=submit_time,
+            reason=reason,
+            source="squeue",
+        )
+
+
+def _parse_squeue_details(output):
+    return list(_iter_squeue_records(output))
+
+
+def _iter_sacct_records(output):
     seen = set()
 
-    for line in output.splitlines():
+    for line in _iter_output_lines(output):
+        line = line.rstrip("\n")
         if not line.strip():
             continue
 
@@ -207,6 +298,7 @@ def _parse_sacct_details(output):
             submit_time,
             exit_code,
         ) = fields[:12]
+        end_time = fields[12] if len(fields) > 12 else ""
 
         # Skip batch/extern/step records so each Slurm job appears once.
         base_job_id = job_id.split(".")[0]
@@ -214,25 +306,29 @@ def _parse_sacct_details(output):
             continue
 
         seen.add(base_job_id)
-        jobs.append({
-            "job_id": base_job_id,
-            "job_name": job_name,
-            "user": user,
-            "account": account,
-            "partition": partition,
-            "state": _normalize_job_state(state),
-            "state_raw": state,
-            "nodes": safe_int(nodes, 0),
-            "cpus": safe_int(cpus, 0),
-            "gpus": 0,
-            "runtime": elapsed,
-            "time_limit": time_limit,
-            "submit_time": submit_time,
-            "exit_code": exit_code,
-            "source": "sacct",
-        })
-
-    return jobs
+        yield JobRecord(
+            job_id=base_job_id,
+            job_name=job_name,
+            user=user,
+            account=account,
+            partition=partition,
+            state=_normalize_job_state(state),
+            state_raw=state,
+            nodes=safe_int(nodes, 0),
+            cpus=safe_int(cpus, 0),
+            gpus=0,
+            runtime=elapsed,
+            time_limit=time_limit,
+            submit_time=submit_time,
+            exit_code=exit_code,
+            end_time=end_time,
+            source="sacct",
+        )
+
+
+def _serialize_jobs(jobs):
+    """Convert JobRecords to the JSON shape returned by the job routes."""
+    return [job.to_dict() for job in jobs]
 
 
 def _merge_job_records(active_jobs, historical_jobs):
@@ -241,39 +337,56 @@ def _merge_job_records(active_jobs, historical_jobs):
     return list(merged.values())
 
 
-def _get_squeue_jobs(user=None):
-    command = [
-        "squeue",
-        "--noheader",
-        "--format=%i|%j|%u|%a|%P|%t|%D|%C|%b|%M|%l|%V|%R",
-    ]
+_SQUEUE_SNAPSHOT_KEY = ("squeue-snapshot",)
+_SQUEUE_COMMAND = [
+    "squeue",
+    "--noheader",
+    "--format=%i|%j|%u|%a|%P|%t|%D|%C|%b|%M|%l|%V|%R",
+]
+
+
+def _load_squeue_snapshot():
+    return JobTable(_iter_squeue_records(stream_process_lines(_SQUEUE_COMMAND)))
 
-    if user and user != "all":
-        command.extend(["-u", user])
 
-    output = _run_cached_slurm_command(command, _ACTIVE_LIST_TTL)
-    return _parse_squeue_details(output)
+def _get_squeue_snapshot():
+    """Return a CacheResult holding a JobTable of the whole queue."""
+    return _slurm_cache.lookup(
+        _SQUEUE_SNAPSHOT_KEY,
+        _ACTIVE_LIST_TTL,
+        _load_squeue_snapshot,
+        max_stale_seconds=_ACTIVE_LIST_MAX_STALE,
+    )
+
+
+def _get_squeue_jobs(user=None):
+    """Return a CacheResult with the active jobs of one user, or of everyone."""
+    result = _get_squeue_snapshot()
+    return result._replace(value=result.value.select(user=None if user == "all" else user))
 
 
 def _normalize_history_window(window):
+    """Return the number of days covered by a history window name."""
     normalized = (window or _DEFAULT_HISTORY_WINDOW).strip().lower()
     allowed_windows = {
-        "24h": "now-1days",
-        "1d": "now-1days",
-        "7d": "now-7days",
-        "14d": "now-14days",
-        "30d": "now-30days",
+        "24h": 1,
+        "1d": 1,
+        "7d": 7,
+        "14d": 14,
+        "30d": 30,
+        "90d": 90,
+        "1y": 365,
     }
     return allowed_windows.get(normalized, allowed_windows[_DEFAULT_HISTORY_WINDOW])
 
 
-def _get_sacct_jobs(history_window=None, user=None, all_users=False):
+def _sacct_command(starttime, user=None, all_users=False):
     command = [
         "sacct",
         "--noheader",
         "--parsable2",
-        f"--starttime={_normalize_history_window(history_window)}",
-        "--format=JobID,JobName,User,Account,Partition,State,NNodes,NCPUS,Elapsed,Timelimit,Submit,ExitCode",
+        f"--starttime={starttime}",
+        "--format=JobID,JobName,User,Account,Partition,State,NNodes,NCPUS,Elapsed,Timelimit,Submit,ExitCode,End",
     ]
 
     if all_users:
@@ -283,13 +396,161 @@ def _get_sacct_jobs(history_window=None, user=None, all_users=False):
         if selected_user:
             command.extend(["--user", selected_user])
 
-    output = _run_cached_slurm_command(command, _SACCT_TTL, timeout=30)
-    return _parse_sacct_details(output)
+    return command
 
 
-def _get_job_detail(job_id):
-    output = _run_slurm_command(["scontrol", "show", "job", str(job_id)])
-    details = _parse_scontrol_output(output)["job_details"]
+def _history_cache_key(user, days):
+    return ("sacct-history", user, days)
+
+
+def _load_stored_history(user, days):
+    """Refresh the user's local history store incrementally and read one window from it."""
+    window_start = time.time() - days * 24 * 3600
+    store = JobHistoryStore.for_user(user)
+    store.refresh(
+        lambda starttime: [
+            job.to_dict()
+            for job in _iter_sacct_records(
+                stream_process_lines(_sacct_command(starttime, user), timeout=_SACCT_BACKFILL_TIMEOUT)
+            )
+        ],
+        window_start,
+    )
+    return JobTable(JobRecord.from_dict(job) for job in store.jobs_since(window_start))
+
+
+def _get_sacct_jobs(history_window=None, user=None, all_users=False):
+    """Return a CacheResult holding a JobTable of the selected sacct history."""
+    days = _normalize_history_window(history_window)
+    selected_user = None if all_users else user or os.getenv("USER")
+
+    # Only the current user's scratch dir is writable, so only their history is stored.
+    if selected_user and selected_user == os.getenv("USER"):
+        try:
+            return _slurm_cache.lookup(
+                _history_cache_key(selected_user, days),
+                _SACCT_HISTORY_TTL,
+                lambda: _load_stored_history(selected_user, days),
+                max_stale_seconds=_SACCT_MAX_STALE,
+            )
+        except (OSError, sqlite3.Error) as e:
+            logging.warning("Job history store unavailable, querying sacct directly: %s", e)
+
+    return _slurm_cache.lookup(
+        _direct_sacct_key(days, selected_user, all_users),
+        _SACCT_HISTORY_TTL,
+        lambda: _load_direct_sacct(days, selected_user, all_users),
+        max_stale_seconds=_SACCT_MAX_STALE,
+    )
+
+
+def _direct_sacct_days(days, all_users):
+    return min(days, _ALL_USERS_MAX_HISTORY_DAYS) if all_users else days
+
+
+def _direct_sacct_key(days, selected_user=None, all_users=False):
+    return ("sacct-window", "all" if all_users else selected_user, _direct_sacct_days(days, all_users))
+
+
+def _sacct_jobs_key(selected_user=None, all_users=False):
+    return ("sacct-jobs", "all" if all_users else selected_user)
+
+
+def _in_sacct_window(job, window_start_text):
+    if not _is_final_job_state(job.state):
+        return True
+
+    return (job.end_time or "") >= window_start_text or (job.submit_time or "") >= window_start_text
+
+
+def _load_direct_sacct(days, selected_user=None, all_users=False):
+    """
+    Return a JobTable of one sacct window without re-reading finished jobs.
+
+    Every job seen for the scope is kept in one cache entry without a TTL (see
+    _job_cache_ttl), so a refresh only asks sacct for jobs active since the
+    previous one; that re-reports every job still pending or running.
+    """
+    days = _direct_sacct_days(days, all_users)
+    queried_at = time.time()
+    window_start = queried_at - days * 24 * 3600
+    key = _sacct_jobs_key(selected_user, all_users)
+
+    known = _slurm_cache.get(key)
+    if known is not None and known["covered_since"] <= window_start:
+        query_start = known["high_water"] - _SACCT_REFRESH_OVERLAP_SECONDS
+        jobs = dict(known["jobs"])
+        covered_days = max(known["covered_days"], days)
+        covered_since = max(known["covered_since"], queried_at - covered_days * 24 * 3600)
+    else:
+        query_start = window_start
+        jobs = {}
+        covered_days = days
+        covered_since = window_start
+
+    command = _sacct_command(format_sacct_time(query_start), selected_user, all_users)
+    for job in _iter_sacct_records(stream_process_lines(command, timeout=_SACCT_TIMEOUT)):
+        jobs[job.job_id] = job
+
+    return _store_sacct_jobs(key, jobs, queried_at, covered_since, covered_days, window_start)
+
+
+def _store_sacct_jobs(key, jobs, queried_at, covered_since, covered_days, window_start):
+    """Cache every job seen for a scope and return the JobTable of one window of it."""
+    covered_since_text = format_sacct_time(covered_since)
+    jobs = {job_id: job for job_id, job in jobs.items() if _in_sacct_window(job, covered_since_text)}
+    _slurm_cache.set(
+        key,
+        {"jobs": jobs, "high_water": queried_at, "covered_since": covered_since, "covered_days": covered_days},
+        None,
+    )
+
+    window_start_text = format_sacct_time(window_start)
+    return JobTable(job for job in jobs.values() if _in_sacct_window(job, window_start_text))
+
+
+def _get_streamed_sacct_page(days, accepts, offset, limit):
+    """
+    Serve a page of a cold --allusers sacct window without reading all of it.
+
+    sacct lists jobs in job id order, so a page of an unfiltered window is
+    final once the jobs before it have been read. sacct is stopped (closing
+    the stream kills it) as soon as the page and one more accepted job are
+    in, which also answers has_next. A window that ends before that was read
+    whole, so it is cached like _load_direct_sacct would and the route serves
+    it from there. Returns (page_jobs, has_next), or None when the window is
+    cached.
+    """
+    days = _direct_sacct_days(days, all_users=True)
+    window_key = _direct_sacct_key(days, all_users=True)
+    jobs_key = _sacct_jobs_key(all_users=True)
+    if _slurm_cache.contains(window_key) or _slurm_cache.contains(jobs_key):
+        return None
+
+    queried_at = time.time()
+    window_start = queried_at - days * 24 * 3600
+    window_start_text = format_sacct_time(window_start)
+    lines = stream_process_lines(
+        _sacct_command(window_start_text, all_users=True), timeout=_SACCT_TIMEOUT
+    )
+    jobs = {}
+    matches = []
+    try:
+        for job in _iter_sacct_records(lines):
+            jobs[job.job_id] = job
+            if _in_sacct_window(job, window_start_text) and accepts(job):
+                matches.append(job)
+                if len(matches) > offset + limit:
+                    return matches[offset:offset + limit], True
+    finally:
+        lines.close()
+
+    table = _store_sacct_jobs(jobs_key, jobs, queried_at, window_start, days, window_start)
+    _slurm_cache.set(window_key, table, _SACCT_HISTORY_TTL, _SACCT_MAX_STALE)
+    return None
+
+
+def _build_job_detail(details, job_id):
     return {
         "job_id": details.get("job_id", str(job_id)),
         "job_name": details.get("job_name"),
@@ -310,6 +571,89 @@ def _get_job_detail(job_id):
     }
 
 
+def _job_detail_key(job_id):
+    return ("job-detail", str(job_id))
+
+
+def _cache_job_detail(job_id, detail):
+    return _slurm_cache.set(_job_detail_key(job_id), detail, _job_cache_ttl(detail["state"], _JOB_DETAIL_ACTIVE_TTL))
+
+
+def _get_job_detail(job_id):
+    cached = _slurm_cache.get(_job_detail_key(job_id))
+    if cached is not None:
+        return cached
+
+    output = _run_slurm_command(["scontrol", "show", "job", str(job_id)])
+    return _cache_job_detail(job_id, _build_job_detail(_parse_scontrol_output(output)["job_details"], job_id))
+
+
+def _scontrol_line_job_ids(line):
+    match = _SCONTROL_JOB_IDS.match(line)
+    if not match:
+        return ()
+
+    job_id, array_job_id, array_task_id = match.groups()
+    if array_job_id is None:
+        return (job_id,)
+
+    return (job_id, f"{array_job_id}_{array_task_id}", f"{array_job_id}_[{array_task_id}]")
+
+
+def _get_job_details(job_ids):
+    """
+    Return {job_id: details} for the requested jobs from one scontrol pass.
+
+    Cached details are reused; the rest are read from a single
+    `scontrol --oneliner show job`, which stops as soon as every requested job
+    has been seen. Jobs slurmctld no longer knows about are left out.
+    """
+    details = {}
+    wanted = set()
+    for job_id in job_ids:
+        cached = _slurm_cache.get(_job_detail_key(job_id))
+        if cached is None:
+            wanted.add(job_id)
+        else:
+            details[job_id] = cached
+
+    if not wanted:
+        return details
+
+    lines = stream_process_lines(["scontrol", "--oneliner", "show", "job"])
+    try:
+        for line in lines:
+            matched = wanted.intersection(_scontrol_line_job_ids(line))
+            if not matched:
+                continue
+
+            job_details = _parse_scontrol_output(line)["job_details"]
+            for job_id in matched:
+                details[job_id] = _cache_job_detail(job_id, _build_job_detail(job_details, job_id))
+
+            wanted -= matched
+            if not wanted:
+                break
+    finally:
+        lines.close()
+
+    return details
+
+
+def _parse_job_ids(value):
+    """Split a comma-separated ids parameter, keeping order and dropping duplicates."""
+    job_ids = []
+    for job_id in (value or "").split(","):
+        job_id = job_id.strip()
+        if not job_id or job_id in job_ids:
+            continue
+        if not _JOB_ID_PATTERN.fullmatch(job_id):
+            raise ValueError(f"Invalid job id: {job_id}")
+        job_ids.append(job_id)
+
+    return job_ids
+
+
 def _build_jobs_summary(jobs):
     states = ["Running", "Pending", "Completed", "Failed", "Cancelled", "Timeout"]
     state_counts = {state: 0 for state in states}
@@ -342,43 +686,29 @@ def _build_jobs_summary(jobs):
     }
 
 
-def _state_matches_filter(job_state, state_filter):
+def _state_filter_values(state_filter):
+    """Return the job states accepted by a state filter, or None to accept all."""
     normalized_filter = (state_filter or "").strip().lower()
     if not normalized_filter or normalized_filter == "all":
-        return True
+        return None
     if normalized_filter == "active":
-        return job_state in {"Running", "Pending", "Completing", "Suspended"}
-
-    return job_state.lower() == _normalize_job_state(normalized_filter).lower()
+        return {"Running", "Pending", "Completing", "Suspended"}
 
+    return {_normalize_job_state(normalized_filter)}
 
-def _filter_jobs(jobs, state="", partition="", user="", account="", search=""):
-    search_value = (search or "").strip().lower()
-    partition_value = (partition or "").strip().lower()
-    user_value = (user or "").strip().lower()
-    account_value = (account or "").strip().lower()
 
-    filtered = []
-    for job in jobs:
-        if not _state_matches_filter(job.get("state") or "", state):
-            continue
-        if partition_value and str(job.get("partition") or "").lower() != partition_value:
-            continue
-        if user_value and user_value != "all" and str(job.get("user") or "").lower() != user_value:
-            continue
-        if account_value and str(job.get("account") or "").lower() != account_value:
-            continue
-        if search_value:
-            haystack = " ".join(
-                str(job.get(key) or "").lower()
-                for key in ["job_id", "job_name", "user", "account", "partition", "state"]
-            )
-            if search_value not in haystack:
-                continue
-
-        filtered.append(job)
-
-    return filtered
+def _query_jobs(table, page, page_size, state="", partition="", user="", account="", search=""):
+    """Return (page_jobs, total, has_next) using the table's indexes."""
+    user_value = (user or "").strip()
+    filters = {
+        "state": _state_filter_values(state),
+        "partition": (partition or "").strip(),
+        "user": "" if user_value.lower() == "all" else user_value,
+        "account": (account or "").strip(),
+    }
+    start = (page - 1) * page_size
+    page_jobs, total = table.query(filters, search=search, offset=start, limit=page_size)
+    return page_jobs, total, start + page_size < total
 
 
 def _is_history_state(state):
@@ -393,34 +723,76 @@ def _paginate_jobs(jobs, page, page_size):
     return jobs[start:end], total, end < len(jobs)
 
 
+def _load_jobs_summary(summary_user):
+    errors = []
+    active_jobs = []
+    historical_jobs = []
+
+    try:
+        active_jobs = _get_squeue_jobs().value
+    except Exception as e:
+        errors.append(f"squeue: {str(e)}")
+
+    try:
+        historical_jobs = _get_sacct_jobs(history_window=_SUMMARY_HISTORY_WINDOW, user=summary_user).value.jobs
+    except Exception as e:
+        errors.append(f"sacct: {str(e)}")
+
+    jobs = _merge_job_records(active_jobs, historical_jobs)
+    response = _build_jobs_summary(jobs)
+    response["total_jobs"] = len(jobs)
+
+    if errors:
+        response["warnings"] = errors
+
+    return response
+
+
 def _get_jobs_summary_cached():
     summary_user = os.getenv("USER")
+    return _slurm_cache.lookup(
+        ("jobs-summary", _SUMMARY_HISTORY_WINDOW, summary_user),
+        _SUMMARY_TTL,
+        lambda: _load_jobs_summary(summary_user),
+        max_stale_seconds=_SUMMARY_MAX_STALE,
+    )
 
-    def _load():
-        errors = []
-        active_jobs = []
-        historical_jobs = []
 
-        try:
-            active_jobs = _get_squeue_jobs()
-        except Exception as e:
-            errors.append(f"squeue: {str(e)}")
-
-        try:
-            historical_jobs = _get_sacct_jobs(history_window=_SUMMARY_HISTORY_WINDOW, user=summary_user)
-        except Exception as e:
-            errors.append(f"sacct: {str(e)}")
+def _prewarm_job_caches(lead_seconds):
+    """
+    Reload the squeue snapshot, 24h sacct history and summary entries the job
+    routes read when they are missing or expire within lead_seconds. Runs on
+    the poller thread.
+    """
+    user = os.getenv("USER")
+    _slurm_cache.prefetch(
+        _SQUEUE_SNAPSHOT_KEY,
+        _ACTIVE_LIST_TTL,
+        _load_squeue_snapshot,
+        max_stale_seconds=_ACTIVE_LIST_MAX_STALE,
+        lead_seconds=lead_seconds,
+    )
 
-        jobs = _merge_job_records(active_jobs, historical_jobs)
-        response = _build_jobs_summary(jobs)
-        response["total_jobs"] = len(jobs)
+    for days in {_normalize_history_window(_DEFAULT_HISTORY_WINDOW), _normalize_history_window(_SUMMARY_HISTORY_WINDOW)}:
+        _slurm_cache.prefetch(
+            _history_cache_key(user, days),
+            _SACCT_HISTORY_TTL,
+            lambda days=days: _load_stored_history(user, days),
+            max_stale_seconds=_SACCT_MAX_STALE,
+            lead_seconds=lead_seconds,
+        )
 
-        if errors:
-            response["warnings"] = errors
+    # Rebuilt last so it is derived from the command output refreshed above.
+    _slurm_cache.prefetch(
+        ("jobs-summary", _SUMMARY_HISTORY_WINDOW, user),
+        _SUMMARY_TTL,
+        lambda: _load_jobs_summary(user),
+        max_stale_seconds=_SUMMARY_MAX_STALE,
+        lead_seconds=lead_seconds,
+    )
 
-        return response
 
-    return _slurm_cache.get_or_set(("jobs-summary", _SUMMARY_HISTORY_WINDOW, summary_user), _SUMMARY_TTL, _load)
+_job_poller = BackgroundPoller("jobs", _prewarm_job_caches)
 
 
 def _parse_project_accounts(output):
@@ -551,18 +923,22 @@ def set_default_account():
 
 
 @api.route("/jobs", methods=["GET"])
+@conditional_get()
 def get_user_jobs():
+    _job_poller.touch()
     try:
-        jobs = _get_squeue_jobs(user=os.getenv("USER"))
-        return jsonify({"jobs": jobs}), 200
+        result = _get_squeue_jobs(user=os.getenv("USER"))
+        return _snapshot_response(lambda: {"jobs": _serialize_jobs(result.value)}, result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route("/jobs/list", methods=["GET"])
+@conditional_get()
 def get_jobs_list():
     """Return a paginated job list without per-job scontrol enrichment."""
+    _job_poller.touch()
     try:
         page = parse_positive_int(request.args.get("page"), 1)
         page_size = parse_positive_int(request.args.get("page_size"), 50, maximum=200)
@@ -574,104 +950,168 @@ def get_jobs_list():
         history_window = request.args.get("history_window", _DEFAULT_HISTORY_WINDOW)
         all_users = request.args.get("all_users", "").lower() in {"1", "true", "yes"} or user == "all"
 
+        if _is_history_state(state) and all_users and not any(
+            value.strip() for value in (partition, account, search, "" if user == "all" else user)
+        ):
+            states = _state_filter_values(state)
+            streamed_page = _get_streamed_sacct_page(
+                _normalize_history_window(history_window),
+                lambda job: states is None or job.state in states,
+                (page - 1) * page_size,
+                page_size,
+            )
+            if streamed_page is not None:
+                page_jobs, has_next = streamed_page
+                return jsonify({
+                    "jobs": _serialize_jobs(page_jobs),
+                    "page": page,
+                    "page_size": page_size,
+                    "total": None,
+                    "has_next": has_next,
+                    "partial": True,
+                    "cache": {"age": 0.0, "stale": False},
+                }), 200
+
         if _is_history_state(state):
-            jobs = _get_sacct_jobs(
+            result = _get_sacct_jobs(
                 history_window=history_window,
                 user=None if all_users else user or os.getenv("USER"),
                 all_users=all_users,
             )
         else:
-            jobs = _get_squeue_jobs(user=None if user == "all" else user or None)
-
-        filtered_jobs = _filter_jobs(
-            jobs,
-            state=state,
-            partition=partition,
-            user="" if user == "all" else user,
-            account=account,
-            search=search,
-        )
-        page_jobs, total, has_next = _paginate_jobs(filtered_jobs, page, page_size)
+            result = _get_squeue_snapshot()
+
+        def _build():
+            page_jobs, total, has_next = _query_jobs(
+                result.value,
+                page,
+                page_size,
+                state=state,
+                partition=partition,
+                user=user,
+                account=account,
+                search=search,
+            )
+            return {
+                "jobs": _serialize_jobs(page_jobs),
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "has_next": has_next,
+            }
 
-        return jsonify({
-            "jobs": page_jobs,
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "has_next": has_next,
-        }), 200
+        return _snapshot_response(_build, result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route("/jobs/details", methods=["GET"])
+@conditional_get()
 def get_jobs_details():
-    """Legacy route kept for compatibility; prefer /jobs/list and /jobs/<job_id>."""
+    """
+    With `ids=1,2,...`, return scontrol details for many jobs from one
+    scontrol pass. Without it this is the legacy active-jobs route, kept for
+    compatibility; prefer /jobs/list and /jobs/<job_id>.
+    """
+    _job_poller.touch()
     try:
         job_id = request.args.get("job_id")
         if job_id:
             return jsonify({"error": "Use /api/jobs/<job_id> for job details"}), 410
 
+        if "ids" in request.args:
+            try:
+                job_ids = _parse_job_ids(request.args.get("ids"))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+            if not job_ids:
+                return jsonify({"error": "Missing ids"}), 400
+            if len(job_ids) > _MAX_JOB_DETAIL_BATCH:
+                return jsonify({"error": f"At most {_MAX_JOB_DETAIL_BATCH} job ids per request"}), 400
+
+            details = _get_job_details(job_ids)
+            return jsonify({
+                "jobs": [details[job_id] for job_id in job_ids if job_id in details],
+                "missing": [job_id for job_id in job_ids if job_id not in details],
+            }), 200
+
         errors = []
         active_jobs = []
+        results = []
 
         try:
-            active_jobs = _get_squeue_jobs()
+            active_result = _get_squeue_jobs()
+            active_jobs = active_result.value
+            results.append(active_result)
         except Exception as e:
             errors.append(f"squeue: {str(e)}")
 
-        response = {
-            "jobs": active_jobs,
-            "summary": _get_jobs_summary_cached(),
-        }
+        summary_result = _get_jobs_summary_cached()
+        results.append(summary_result)
 
-        if errors:
-            response["warnings"] = errors
+        def _build():
+            response = {
+                "jobs": _serialize_jobs(active_jobs),
+                "summary": summary_result.value,
+            }
+            if errors:
+                response["warnings"] = errors
+            return response
 
-        return jsonify(response), 200
+        return _snapshot_response(_build, *results)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route("/jobs/past_jobs", methods=["GET"])
+@conditional_get()
 def get_past_user_jobs():
     """Return the current user's recent jobs, newest first."""
+    _job_poller.touch()
     try:
         page = parse_positive_int(request.args.get("page"), 1)
         page_size = parse_positive_int(request.args.get("page_size"), 25, maximum=200)
 
-        jobs = _get_sacct_jobs(
+        result = _get_sacct_jobs(
             history_window=_DEFAULT_HISTORY_WINDOW,
             user=os.getenv("USER"),
             all_users=False,
         )
-        jobs.sort(key=lambda job: job.get("submit_time") or "", reverse=True)
-        page_jobs, total, has_next = _paginate_jobs(jobs, page, page_size)
 
-        return jsonify({
-            "jobs": page_jobs,
-            "page": page,
-            "total": total,
-            "page_size": page_size,
-            "has_next": has_next,
-        }), 200
+        def _build():
+            jobs = sorted(result.value.jobs, key=lambda job: job.get("submit_time") or "", reverse=True)
+            page_jobs, total, has_next = _paginate_jobs(jobs, page, page_size)
+            return {
+                "jobs": _serialize_jobs(page_jobs),
+                "page": page,
+                "total": total,
+                "page_size": page_size,
+                "has_next": has_next,
+            }
+
+        return _snapshot_response(_build, result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route("/jobs/summary", methods=["GET"])
+@conditional_get()
 def get_jobs_summary():
     """Return aggregate Slurm job counts for Job Explorer charts and KPIs."""
+    _job_poller.touch()
     try:
-        return jsonify(_get_jobs_summary_cached()), 200
+        result = _get_jobs_summary_cached()
+        return _snapshot_response(lambda: result.value, result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @api.route("/jobs/<job_id>", methods=["GET"])
+@conditional_get()
 def get_job_detail(job_id):
     """Return lazy details for one job. This is the only route using scontrol."""
     try:
@@ -692,49 +1132,43 @@ def cancel_job(job_id):
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
-        # scancel changes scheduler state outside this process, so cached squeue
-        # and derived summary data must be cleared before the next refresh.
-        _invalidate_active_job_caches()
+        # scancel changes scheduler state outside this process, so cached squeue,
+        # summary and job detail data must be cleared before the next refresh.
+        _invalidate_active_job_caches(job_id)
         return jsonify({"message": f"Job {job_id} canceled successfully"}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@api.route("/utilization", methods=["GET"])
-def get_utilization():
+@api.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Return Slurm and node cache counters per key namespace and the job poller's state."""
     try:
-        def _count(cmd):
-            return _slurm_cache.get_or_set(
-                ("shell-count", cmd),
-                _SUMMARY_TTL,
-                lambda: int(subprocess.check_output(cmd, shell=True, timeout=20).decode("utf-8").strip()),
-            )
+        return jsonify({
+            **_slurm_cache.stats(),
+            "poller": _job_poller.status(),
+            "cluster": cluster_cache_stats(),
+        }), 200
 
-        allocated_nodes = _count("/sw/local/bin/pestat -s alloc | tail -n+4 | wc -l")
-        mixed_nodes     = _count("/sw/local/bin/pestat -s mix  | tail -n+4 | wc -l")
-        idle_nodes      = _count("/sw/local/bin/pestat -s idle | tail -n+4 | wc -l")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        allocated_cpus = _count(
-            "/sw/local/bin/pestat -s alloc,mix,idle | tail -n+4 | awk '{print $4}' "
-            "| awk 'NR>3' | awk '{s+=$1} END {printf \"%.0f\", s}'"
-        )
 
-        total_cpus = _count(
-            "/sw/local/bin/pestat -s alloc,mix,idle | tail -n+4 | awk '{print $5}' "
-            "| awk 'NR>3' | awk '{s+=$1} END {printf \"%.0f\", s}'"
-        )
+@api.route("/utilization", methods=["GET"])
+@conditional_get()
+def get_utilization():
+    """Node, core and job counts from the shared node snapshot and squeue snapshot."""
+    try:
+        utilization = summarize_utilization(get_node_table().value)
 
-        running_jobs = _count("/usr/bin/squeue --noheader --states=RUNNING | wc -l")
-        pending_jobs = _count("/usr/bin/squeue --noheader --states=PENDING | wc -l")
+        queue = _get_squeue_snapshot().value
+        utilization["jobs"] = {
+            "running": queue.count("state", "Running"),
+            "pending": queue.count("state", "Pending"),
+        }
 
-        return jsonify({
-            "nodes":  {"allocated": allocated_nodes, "mixed": mixed_nodes, "idle": idle_nodes},
-            "cores":  {"allocated": allocated_cpus,  "idle": total_cpus - allocated_cpus},
-            "jobs":   {"running": running_jobs, "pending": pending_jobs},
-        }), 200
+        return jsonify(utilization), 200
 
-    except subprocess.CalledProcessError as e:
-        return jsonify({"error": f"Command failed: {e.output.decode('utf-8')}"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,32 @@
+"""
+Fast JSON encoding for jsonify() across the app.
+
+Flask 2.0 has no pluggable JSON provider: jsonify() instantiates
+`app.json_encoder` and calls its encode(). FastJSONEncoder overrides
+encode() to use the library serialization.py selected (orjson, or ujson),
+and falls back to Flask's own encoder for indented output (debug /
+JSONIFY_PRETTYPRINT_REGULAR) and for anything the fast library rejects. Key
+sorting follows JSON_SORT_KEYS, and values JSON has no type for (dates,
+UUIDs, dataclasses, Markup) still go through Flask's default(), so responses
+stay the same apart from non-ASCII text being sent as UTF-8 instead of \\u
+escapes.
+
+Installed in app.py with `app.json_encoder = FastJSONEncoder`.
+"""
+from flask.json import JSONEncoder
+
+from .serialization import FAST_ENCODE_ERRORS, JSON_BACKEND, fast_dumps
+
+
+class FastJSONEncoder(JSONEncoder):
+    """Flask's JSONEncoder, encoding compact output with orjson or ujson when available."""
+
+    def encode(self, o):
+        if self.indent is None and JSON_BACKEND != "json":
+            try:
+                return fast_dumps(o, sort_keys=self.sort_keys, default=self.default).decode("utf-8")
+            except FAST_ENCODE_ERRORS:
+                # Let the stdlib decide on values the fast library rejects.
+                pass
+
+        return super().encode(o)
@@ -0,0 +1,504 @@
+"""
+Module catalog building and precompiled snapshots.
+
+A catalog is built from one `<cluster>-modules.json` file: the raw records,
+records grouped by module name (newest version first), the extensions that
+depend on each module (sorted by name and version),
+one summary per module, an inverted index over the summaries for
+/available_modules/search, the dependency graph behind
+/available_modules/resolve, and the /available_modules and
+/available_modules/summary bodies already serialized to JSON.
+
+Building it is slow for a multi-MB catalog, so the result is also
+written as a pickle next to the source file (`<cluster>-modules.catalog.pickle`),
+tagged with the source file's mtime and size. Any worker whose source file
+still matches loads the snapshot in milliseconds instead of rebuilding. A
+snapshot that is missing, stale or unreadable is rebuilt, and writing it is
+best effort. ModuleCatalog wraps a loaded catalog for the routes and
+remembers when its source file was last checked.
+
+Snapshots are built ahead of deployment with:
+
+    python views/api/module_catalog.py modules/*-modules.json
+"""
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    from .serialization import dumps_json
+except ImportError:  # run as a build script: python views/api/module_catalog.py
+    from serialization import dumps_json
+
+COMPILER_PATTERN = re.compile(r"^(?:AOCC|Clang|GCC(?:core)?|intel|NVHPC)/", re.I)
+# Bump whenever the catalog layout changes so older snapshots are rebuilt.
+SNAPSHOT_FORMAT = 6
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# How much a query term found in each summary field counts towards its rank.
+SEARCH_FIELD_WEIGHTS = (("name", 8), ("full_name", 4), ("compiler", 2), ("description", 1))
+_PREFIX_MATCH_FACTOR = 0.6
+_FUZZY_MATCH_FACTOR = 0.3
+
+
+def version_key(record):
+    version = str(record.get("version", ""))
+    match = re.search(r"\d+(?:\.\d+)*", version)
+    numeric = tuple(int(part) for part in match.group(0).split(".")) if match else ()
+    suffix = version[match.end():].lower() if match else version.lower()
+    prefix = version[:match.start()].lower() if match else ""
+    variant_rank = -1 if "nostub" in prefix or "nostub" in suffix else 0
+    return numeric, variant_rank, suffix
+
+
+def source_signature(modules_path):
+    stat = Path(modules_path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot_path(modules_path):
+    modules_path = Path(modules_path)
+    name = modules_path.name[:-len(".json")] if modules_path.name.endswith(".json") else modules_path.name
+    return modules_path.with_name(f"{name}.catalog.pickle")
+
+
+def search_tokens(text):
+    return SEARCH_TOKEN_PATTERN.findall(str(text or "").lower())
+
+
+def compiler_family(summary):
+    return summary["compiler"].split("/", 1)[0] if summary["compiler"] else "none"
+
+
+def build_search_index(summaries):
+    """
+    Index summaries by the terms of their name, full_name, compiler and
+    description. Postings map a term to {summary position: field weight},
+    keeping the best-weighted field the term appears in.
+    """
+    postings = defaultdict(dict)
+    for position, summary in enumerate(summaries):
+        for field, weight in SEARCH_FIELD_WEIGHTS:
+            for term in search_tokens(summary.get(field)):
+                if postings[term].get(position, 0) < weight:
+                    postings[term][position] = weight
+
+    return {"postings": dict(postings), "terms": sorted(postings)}
+
+
+def _within_edit_distance(left, right, limit):
+    if abs(len(left) - len(right)) > limit:
+        return False
+
+    previous = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, 1):
+        current = [i]
+        for j, right_char in enumerate(right, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (left_char != right_char),
+            ))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def _term_matches(index, term):
+    """
+    Yield (indexed term, factor) for an exact match, every term that starts
+    with `term`, and, when there is neither, terms within a small edit
+    distance that share its first letter.
+    """
+    terms = index["terms"]
+    start = bisect_left(terms, term)
+    matched = False
+    for position in range(start, len(terms)):
+        candidate = terms[position]
+        if not candidate.startswith(term):
+            break
+        matched = True
+        yield candidate, 1.0 if candidate == term else _PREFIX_MATCH_FACTOR
+
+    if matched or len(term) < 4:
+        return
+
+    limit = 1 if len(term) < 8 else 2
+    for position in range(bisect_left(terms, term[0]), len(terms)):
+        candidate = terms[position]
+        if candidate[0] != term[0]:
+            break
+        if _within_edit_distance(term, candidate, limit):
+            yield candidate, _FUZZY_MATCH_FACTOR
+
+
+def search_catalog(catalog, query):
+    """
+    Return [(score, summary)] for summaries matching every term of query,
+    best first. An empty query matches every summary in name order.
+    """
+    summaries = catalog.summaries
+    query_terms = search_tokens(query)
+    if not query_terms:
+        return [(0.0, summary) for summary in summaries]
+
+    index = catalog.search_index
+    scores = None
+    for term in dict.fromkeys(query_terms):
+        term_scores = {}
+        for indexed_term, factor in _term_matches(index, term):
+            for position, weight in index["postings"][indexed_term].items():
+                score = weight * factor
+                if score > term_scores.get(position, 0):
+                    term_scores[position] = score
+
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {
+                position: score + term_scores[position]
+                for position, score in scores.items()
+                if position in term_scores
+            }
+        if not scores:
+            return []
+
+    normalized_query = " ".join(query_terms)
+    results = []
+    for position, score in scores.items():
+        summary = summaries[position]
+        name = " ".join(search_tokens(summary["name"]))
+        if name == normalized_query:
+            score += 100
+        elif name.startswith(normalized_query):
+            score += 20
+        results.append((score, summary))
+
+    results.sort(key=lambda result: (-result[0], result[1]["name"].casefold()))
+    return results
+
+
+def _dependency_sets(record):
+    return [
+        tuple(dependency for dependency in dependency_set if isinstance(dependency, str))
+        for dependency_set in (record.get("dependencies") or [])
+        if isinstance(dependency_set, list) and dependency_set
+    ]
+
+
+def toolchain_of(dependency_set):
+    return next((dependency for dependency in dependency_set if COMPILER_PATTERN.match(dependency)), "")
+
+
+def build_dependency_graph(records):
+    """
+    Index the `dependencies` sets of every record by full_name.
+
+    `requires` maps a module to its alternative dependency sets (any one of
+    them makes it loadable) and `required_by` is the reverse adjacency.
+    `load_plans` memoizes resolve_load_plans per full_name and starts empty.
+    """
+    requires = defaultdict(list)
+    required_by = defaultdict(set)
+    extensions = set()
+
+    for record in records:
+        full_name = record.get("full_name")
+        if not full_name:
+            continue
+        if record.get("is_extension"):
+            extensions.add(full_name)
+
+        for dependency_set in _dependency_sets(record):
+            if dependency_set not in requires[full_name]:
+                requires[full_name].append(dependency_set)
+            for dependency in dependency_set:
+                required_by[dependency].add(full_name)
+
+    return {
+        "requires": dict(requires),
+        "required_by": {name: sorted(dependents) for name, dependents in required_by.items()},
+        "extensions": extensions,
+        "load_plans": {},
+    }
+
+
+def _add_with_prerequisites(graph, full_name, toolchain, plan, trail):
+    """Append full_name to plan after whatever it needs, preferring sets built with toolchain."""
+    if full_name in plan or full_name in trail:
+        return
+
+    dependency_sets = graph["requires"].get(full_name)
+    if dependency_sets:
+        chosen = next(
+            (dependency_set for dependency_set in dependency_sets if toolchain_of(dependency_set) == toolchain),
+            dependency_sets[0],
+        )
+        for dependency in chosen:
+            _add_with_prerequisites(graph, dependency, toolchain, plan, trail | {full_name})
+
+    plan.append(full_name)
+
+
+def resolve_load_plans(graph, full_name):
+    """
+    Return one load plan per dependency set of full_name: the toolchain and
+    the modules to load, in order, with their own prerequisites first.
+    Extensions are provided by the modules of a set, so they are not
+    loaded themselves. Results are memoized in graph["load_plans"].
+    """
+    plans = graph["load_plans"].get(full_name)
+    if plans is not None:
+        return plans
+
+    is_extension = full_name in graph["extensions"]
+    plans = []
+    for dependency_set in graph["requires"].get(full_name) or [()]:
+        toolchain = toolchain_of(dependency_set)
+        modules = []
+        for dependency in dependency_set:
+            _add_with_prerequisites(graph, dependency, toolchain, modules, frozenset([full_name]))
+        if not is_extension:
+            modules.append(full_name)
+        if modules and not any(plan["modules"] == modules for plan in plans):
+            plans.append({
+                "toolchain": toolchain,
+                "modules": modules,
+                "load_command": f"module load {' '.join(modules)}",
+            })
+
+    graph["load_plans"][full_name] = plans
+    return plans
+
+
+def build_catalog(records):
+    """Build the catalog indexes, summaries and serialized bodies for a list of records."""
+    records_by_name = defaultdict(list)
+    extensions_by_dependency = defaultdict(dict)
+    for record in records:
+        if record.get("name") and record.get("version") and record.get("full_name"):
+            records_by_name[record["name"]].append(record)
+        if record.get("is_extension") and record.get("full_name"):
+            dependency_names = {
+                dependency.split("/", 1)[0]
+                for dependency_set in (record.get("dependencies") or [])
+                if isinstance(dependency_set, list)
+                for dependency in dependency_set
+                if isinstance(dependency, str)
+            }
+            extension_summary = {
+                "name": record.get("name", ""),
+                "version": record.get("version", ""),
+                "full_name": record["full_name"],
+            }
+            for dependency_name in dependency_names:
+                extensions_by_dependency[dependency_name][record["full_name"]] = (
+                    extension_summary
+                )
+
+    for versions in records_by_name.values():
+        versions.sort(key=version_key, reverse=True)
+
+    summaries = []
+    for name, versions in records_by_name.items():
+        current = versions[0]
+        dependencies = current.get("dependencies") or []
+        flattened_dependencies = [
+            dependency
+            for dependency_set in dependencies
+            if isinstance(dependency_set, list)
+            for dependency in dependency_set
+        ]
+        compiler = next(
+            (
+                dependency
+                for dependency in flattened_dependencies
+                if COMPILER_PATTERN.match(dependency)
+            ),
+            "",
+        )
+        first_dependency_set = next(
+            (
+                dependency_set
+                for dependency_set in dependencies
+                if isinstance(dependency_set, list) and dependency_set
+            ),
+            [],
+        )
+        load_targets = (
+            first_dependency_set
+            if current.get("is_extension")
+            else [current["full_name"]]
+        )
+        summaries.append(
+            {
+                "name": name,
+                "latest_version": current["version"],
+                "description": current.get("description") or "",
+                "compiler": compiler,
+                "version_count": len(versions),
+                "is_default": bool(current.get("is_default")),
+                "is_extension": bool(current.get("is_extension")),
+                "full_name": current["full_name"],
+                "load_command": (
+                    f"module load {' '.join(load_targets)}" if load_targets else ""
+                ),
+            }
+        )
+
+    summaries.sort(key=lambda summary: summary["name"].casefold())
+    return {
+        "records": records,
+        "records_by_name": dict(records_by_name),
+        "extensions_by_dependency": {
+            name: sorted(
+                extensions.values(),
+                key=lambda extension: (extension["name"].casefold(), version_key(extension)),
+            )
+            for name, extensions in extensions_by_dependency.items()
+        },
+        "summaries": summaries,
+        "search_index": build_search_index(summaries),
+        "dependency_graph": build_dependency_graph(records),
+        "records_json": dumps_json(records),
+        "summaries_json": dumps_json(summaries),
+    }
+
+
+def _read_snapshot(path, signature):
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (
+        OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError
+    ):
+        # Any unreadable snapshot (truncated, corrupt, from another version) is rebuilt.
+        return None
+
+    if (
+        not isinstance(snapshot, dict)
+        or snapshot.get("format") != SNAPSHOT_FORMAT
+        or snapshot.get("signature") != signature
+    ):
+        return None
+    return snapshot.get("catalog")
+
+
+def write_snapshot(modules_path, signature, catalog):
+    """Write catalog atomically to the snapshot file for modules_path."""
+    path = snapshot_path(modules_path)
+    descriptor, temporary_path = tempfile.mkstemp(
+        prefix=f".{path.name}-", dir=str(path.parent)
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            pickle.dump(
+                {"format": SNAPSHOT_FORMAT, "signature": signature, "catalog": catalog},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def load_catalog(modules_path, signature=None):
+    """
+    Return the catalog for modules_path, from its snapshot when the snapshot
+    matches the source file's signature and by building it otherwise.
+    """
+    signature = signature or source_signature(modules_path)
+    catalog = _read_snapshot(snapshot_path(modules_path), signature)
+    if catalog is not None:
+        return catalog
+
+    with Path(modules_path).open("r", encoding="utf-8") as f:
+        catalog = build_catalog(json.load(f))
+
+    try:
+        write_snapshot(modules_path, signature, catalog)
+    except OSError:
+        # The app directory is read-only in some deployments; the catalog is
+        # still served, it is just rebuilt by the next cold worker.
+        pass
+    return catalog
+
+
+class ModuleCatalog:
+    """
+    A loaded catalog, the signature of the source file it was built from,
+    and when that file was last checked for changes.
+
+    Details bodies are serialized on first request and kept, so a module's
+    details are a dict lookup afterwards.
+    """
+
+    def __init__(self, path, signature, catalog):
+        self.path = path
+        self.signature = signature
+        self.records = catalog["records"]
+        self.records_by_name = catalog["records_by_name"]
+        self.extensions_by_dependency = catalog["extensions_by_dependency"]
+        self.summaries = catalog["summaries"]
+        self.search_index = catalog["search_index"]
+        self.dependency_graph = catalog["dependency_graph"]
+        self.records_json = catalog["records_json"]
+        self.summaries_json = catalog["summaries_json"]
+        self.checked_at = time.monotonic()
+        self._details_json = {}
+
+    @classmethod
+    def load(cls, path, signature=None):
+        signature = signature or source_signature(path)
+        return cls(path, signature, load_catalog(path, signature))
+
+    def checked_within(self, seconds):
+        return time.monotonic() - self.checked_at < seconds
+
+    def mark_checked(self):
+        self.checked_at = time.monotonic()
+
+    def details_json(self, name):
+        """Return the serialized /available_modules/details body for name, or None."""
+        body = self._details_json.get(name)
+        if body is None:
+            versions = self.records_by_name.get(name)
+            if not versions:
+                return None
+            body = dumps_json({
+                "name": name,
+                "versions": versions,
+                "extensions": self.extensions_by_dependency.get(name, []),
+            })
+            self._details_json[name] = body
+        return body
+
+
+def main(paths):
+    if not paths:
+        print("usage: python views/api/module_catalog.py <cluster>-modules.json ...", file=sys.stderr)
+        return 2
+
+    for modules_path in paths:
+        signature = source_signature(modules_path)
+        with open(modules_path, "r", encoding="utf-8") as f:
+            catalog = build_catalog(json.load(f))
+        print(f"{write_snapshot(modules_path, signature, catalog)}: {len(catalog['records'])} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
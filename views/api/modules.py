@@ -10,152 +10,153 @@ import os
 import json
 import re
 import subprocess
-from collections import defaultdict
+import time
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock
 from flask import current_app, request, jsonify
 from . import api
+from .compression import precompressed_response
+from .http_cache import conditional_get, json_bytes_response, not_modified, version_etag
+from .module_catalog import (
+    ModuleCatalog,
+    compiler_family,
+    resolve_load_plans,
+    search_catalog,
+    source_signature,
+)
+from .utils import parse_positive_int, safe_int
 
 MODULES_DIR = Path(__file__).resolve().parents[2] / "modules"
 # Optional explicit override used by tests and one-off deployments.
 MODULES_PATH = None
-COMPILER_PATTERN = re.compile(r"^(?:AOCC|Clang|GCC(?:core)?|intel|NVHPC)/", re.I)
-_catalog_cache = {
-    "path": None,
-    "signature": None,
-    "records": None,
-    "records_by_name": None,
-    "extensions_by_dependency": None,
-    "summaries": None,
-}
-
-
-def _get_modules_path():
+CLUSTER_NAME_PATTERN = re.compile(r"[a-z0-9_-]+")
+# Loaded ModuleCatalogs by source path, least recently used first. Any
+# cluster's catalog can be requested with `cluster=`, so cold ones are evicted
+# once the combined size of their source files passes max_cached_bytes.
+_catalog_cache = OrderedDict()
+_catalog_cache_lock = Lock()
+_catalog_settings = {"max_cached_bytes": 8 * 1024 * 1024, "freshness_interval": 5}
+_availability_index = {"key": None, "index": None, "checked_at": None}
+
+
+class UnknownClusterError(LookupError):
+    """Raised when `cluster=` names a cluster without a modules catalog."""
+
+
+@api.record_once
+def _configure_module_catalogs(state):
+    """Apply the `module_catalogs` settings once the app config is known."""
+    settings = state.app.config.get("module_catalogs") or {}
+    for key in ("max_cached_bytes", "freshness_interval"):
+        value = safe_int(settings.get(key))
+        if value is not None:
+            _catalog_settings[key] = value
+
+
+def _available_clusters():
+    return {
+        path.name[:-len("-modules.json")]: path
+        for path in sorted(MODULES_DIR.glob("*-modules.json"))
+    }
+
+
+def _get_modules_path(cluster=None):
+    """Return the catalog path for `cluster` or the configured cluster, without checking it exists."""
+    if cluster:
+        cluster = cluster.strip().lower()
+        if not CLUSTER_NAME_PATTERN.fullmatch(cluster):
+            raise UnknownClusterError(f"Invalid cluster name: {cluster}")
+        return MODULES_DIR / f"{cluster}-modules.json"
+
     if MODULES_PATH is not None:
         return Path(MODULES_PATH)
 
     cluster_name = str(current_app.config.get("cluster_name", "")).strip().lower()
     if not cluster_name:
         raise OSError("Cluster name is not configured")
-    if not re.fullmatch(r"[a-z0-9_-]+", cluster_name):
+    if not CLUSTER_NAME_PATTERN.fullmatch(cluster_name):
         raise OSError(f"Invalid cluster name: {cluster_name}")
 
-    modules_path = MODULES_DIR / f"{cluster_name}-modules.json"
-    if not modules_path.is_file():
-        raise OSError(
-            f"No modules catalog is available for cluster: {cluster_name}"
-        )
-    return modules_path
-
-
-def _version_key(record):
-    version = str(record.get("version", ""))
-    match = re.search(r"\d+(?:\.\d+)*", version)
-    numeric = tuple(int(part) for part in match.group(0).split(".")) if match else ()
-    suffix = version[match.end():].lower() if match else version.lower()
-    prefix = version[:match.start()].lower() if match else ""
-    variant_rank = -1 if "nostub" in prefix or "nostub" in suffix else 0
-    return numeric, variant_rank, suffix
-
-
-def _get_catalog():
-    modules_path = _get_modules_path()
-    signature = (modules_path.stat().st_mtime_ns, modules_path.stat().st_size)
-    cache_is_current = (
-        _catalog_cache["path"] == modules_path
-        and _catalog_cache["signature"] == signature
-    )
-    if cache_is_current:
-        return _catalog_cache
-
-    with modules_path.open("r", encoding="utf-8") as f:
-        records = json.load(f)
-
-    records_by_name = defaultdict(list)
-    extensions_by_dependency = defaultdict(dict)
-    for record in records:
-        if record.get("name") and record.get("version") and record.get("full_name"):
-            records_by_name[record["name"]].append(record)
-        if record.get("is_extension") and record.get("full_name"):
-            dependency_names = {
-                dependency.split("/", 1)[0]
-                for dependency_set in (record.get("dependencies") or [])
-                if isinstance(dependency_set, list)
-                for dependency in dependency_set
-                if isinstance(dependency, str)
-            }
-            extension_summary = {
-                "name": record.get("name", ""),
-                "version": record.get("version", ""),
-                "full_name": record["full_name"],
-            }
-            for dependency_name in dependency_names:
-                extensions_by_dependency[dependency_name][record["full_name"]] = (
-                    extension_summary
-                )
-
-    summaries = []
-    for name, versions in records_by_name.items():
-        sorted_versions = sorted(versions, key=_version_key)
-        current = sorted_versions[-1]
-        dependencies = current.get("dependencies") or []
-        flattened_dependencies = [
-            dependency
-            for dependency_set in dependencies
-            if isinstance(dependency_set, list)
-            for dependency in dependency_set
-        ]
-        compiler = next(
-            (
-                dependency
-                for dependency in flattened_dependencies
-                if COMPILER_PATTERN.match(dependency)
-            ),
-            "",
-        )
-        first_dependency_set = next(
-            (
-                dependency_set
-                for dependency_set in dependencies
-                if isinstance(dependency_set, list) and dependency_set
-            ),
-            [],
-        )
-        load_targets = (
-            first_dependency_set
-            if current.get("is_extension")
-            else [current["full_name"]]
-        )
-        summaries.append(
-            {
-                "name": name,
-                "latest_version": current["version"],
-                "description": current.get("description") or "",
-                "compiler": compiler,
-                "version_count": len(sorted_versions),
-                "is_default": bool(current.get("is_default")),
-                "is_extension": bool(current.get("is_extension")),
-                "full_name": current["full_name"],
-                "load_command": (
-                    f"module load {' '.join(load_targets)}" if load_targets else ""
-                ),
-            }
-        )
+    return MODULES_DIR / f"{cluster_name}-modules.json"
+
+
+def _cached_catalog(modules_path):
+    with _catalog_cache_lock:
+        catalog = _catalog_cache.get(modules_path)
+        if catalog is not None:
+            _catalog_cache.move_to_end(modules_path)
+        return catalog
+
+
+def _get_catalog(cluster=None):
+    """
+    Return the ModuleCatalog for `cluster`, or for the request's `cluster`
+    argument, or for the configured cluster.
 
-    summaries.sort(key=lambda summary: summary["name"].casefold())
-    _catalog_cache.update(
-        {
-            "path": modules_path,
-            "signature": signature,
-            "records": records,
-            "records_by_name": dict(records_by_name),
-            "extensions_by_dependency": {
-                name: list(extensions.values())
-                for name, extensions in extensions_by_dependency.items()
-            },
-            "summaries": summaries,
-        }
-    )
-    return _catalog_cache
+    A cached catalog is trusted for freshness_interval seconds; after that
+    one stat of its source file decides whether it is reloaded.
+    """
+    if cluster is None:
+        cluster = request.args.get("cluster", "")
+    modules_path = _get_modules_path(cluster)
+    catalog = _cached_catalog(modules_path)
+    if catalog is not None and catalog.checked_within(_catalog_settings["freshness_interval"]):
+        return catalog
+
+    try:
+        signature = source_signature(modules_path)
+    except FileNotFoundError:
+        name = modules_path.name[:-len("-modules.json")]
+        if cluster:
+            raise UnknownClusterError(f"No modules catalog is available for cluster: {name}")
+        raise OSError(f"No modules catalog is available for cluster: {name}")
+
+    if catalog is not None and catalog.signature == signature:
+        catalog.mark_checked()
+        return catalog
+
+    # Loads the precompiled snapshot when it matches the file, see module_catalog.
+    catalog = ModuleCatalog.load(modules_path, signature)
+    with _catalog_cache_lock:
+        _catalog_cache[modules_path] = catalog
+        _catalog_cache.move_to_end(modules_path)
+        cached_bytes = sum(cached.signature[1] for cached in _catalog_cache.values())
+        while len(_catalog_cache) > 1 and cached_bytes > _catalog_settings["max_cached_bytes"]:
+            _path, evicted = _catalog_cache.popitem(last=False)
+            cached_bytes -= evicted.signature[1]
+    return catalog
+
+
+def _get_availability_index():
+    """
+    Map each module name to {cluster: versions, newest first} across every
+    cluster catalog.
+
+    Source files are checked at most once per freshness_interval and the
+    index is rebuilt when any of them changed. Catalogs that are not already
+    cached are loaded one at a time and dropped again, so building it never
+    holds more than one extra parsed catalog.
+    """
+    checked_at = _availability_index["checked_at"]
+    if checked_at is not None and time.monotonic() - checked_at < _catalog_settings["freshness_interval"]:
+        return _availability_index["index"]
+
+    clusters = _available_clusters()
+    signatures = {cluster: source_signature(path) for cluster, path in clusters.items()}
+    key = tuple(sorted(signatures.items()))
+    if _availability_index["key"] != key:
+        index = {}
+        for cluster, modules_path in clusters.items():
+            catalog = _cached_catalog(modules_path)
+            if catalog is None or catalog.signature != signatures[cluster]:
+                catalog = ModuleCatalog.load(modules_path, signatures[cluster])
+            for name, versions in catalog.records_by_name.items():
+                index.setdefault(name, {})[cluster] = [record["version"] for record in versions]
+        _availability_index.update({"key": key, "index": index})
+
+    _availability_index["checked_at"] = time.monotonic()
+    return _availability_index["index"]
 
 @api.route('/get_env', methods=['GET'])
 def get_envs():
@@ -268,48 +269,187 @@ def create_venv():
     except Exception as e:
         return jsonify({"error": f"Unexpected error creating venv: {str(e)}"}), 500
 
+def _catalog_etag(catalog, *parts):
+    return version_etag(catalog.path, *catalog.signature, *parts)
+
+
+def _catalog_response(catalog, body, *etag_parts):
+    """
+    Serve a pre-serialized catalog body, or an empty 304 or the stored
+    compressed body for this catalog version when there is one.
+    """
+    etag = _catalog_etag(catalog, *etag_parts)
+    return not_modified(etag) or precompressed_response(etag) or json_bytes_response(body, etag)
+
+
 @api.route('/available_modules', methods=['GET'])
+@conditional_get(max_age=300)
 def list_available_modules():
     try:
-        return jsonify(_get_catalog()["records"])
+        catalog = _get_catalog()
+        return _catalog_response(catalog, catalog.records_json, "records")
+    except UnknownClusterError as e:
+        return jsonify({"error": str(e)}), 404
     except (OSError, json.JSONDecodeError) as e:
         return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
 
 
 @api.route('/available_modules/summary', methods=['GET'])
+@conditional_get(max_age=300)
 def list_available_module_summaries():
     try:
-        return jsonify(_get_catalog()["summaries"])
+        catalog = _get_catalog()
+        return _catalog_response(catalog, catalog.summaries_json, "summaries")
+    except UnknownClusterError as e:
+        return jsonify({"error": str(e)}), 404
     except (OSError, json.JSONDecodeError) as e:
         return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
 
 
-@api.route('/available_modules/details', methods=['GET'])
-def get_available_module_details():
+def _search_facets(results):
+    facets = {"compiler": {}, "type": {}, "has_default": {}}
+    for _score, summary in results:
+        for facet, value in (
+            ("compiler", compiler_family(summary)),
+            ("type", "extension" if summary["is_extension"] else "module"),
+            ("has_default", "true" if summary["is_default"] else "false"),
+        ):
+            facets[facet][value] = facets[facet].get(value, 0) + 1
+    return facets
+
+
+@api.route('/available_modules/search', methods=['GET'])
+@conditional_get(max_age=300)
+def search_available_modules():
+    """
+    Ranked, paged module summaries matching `q` by prefix or close spelling.
+
+    `compiler`, `type` (module|extension) and `has_default` (true|false)
+    narrow the results; facet counts cover every match of `q` so the other
+    choices stay visible while a filter is applied.
+    """
+    query = request.args.get("q", "").strip()
+    page = parse_positive_int(request.args.get("page"), 1)
+    page_size = parse_positive_int(request.args.get("page_size"), 50, maximum=200)
+    compiler = request.args.get("compiler", "").strip()
+    module_type = request.args.get("type", "").strip().lower()
+    has_default = request.args.get("has_default", "").strip().lower()
+
+    if module_type not in ("", "module", "extension"):
+        return jsonify({"error": "type must be module or extension"}), 400
+    if has_default not in ("", "true", "false"):
+        return jsonify({"error": "has_default must be true or false"}), 400
+
+    try:
+        matches = search_catalog(_get_catalog(), query)
+        facets = _search_facets(matches)
+
+        results = [
+            summary
+            for _score, summary in matches
+            if (not compiler or compiler_family(summary).lower() == compiler.lower())
+            and (not module_type or summary["is_extension"] == (module_type == "extension"))
+            and (not has_default or summary["is_default"] == (has_default == "true"))
+        ]
+        start = (page - 1) * page_size
+
+        return jsonify(
+            {
+                "query": query,
+                "results": results[start:start + page_size],
+                "page": page,
+                "page_size": page_size,
+                "total": len(results),
+                "has_next": start + page_size < len(results),
+                "facets": facets,
+            }
+        )
+    except UnknownClusterError as e:
+        return jsonify({"error": str(e)}), 404
+    except (OSError, json.JSONDecodeError) as e:
+        return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
+
+
+@api.route('/available_modules/resolve', methods=['GET'])
+@conditional_get(max_age=300)
+def resolve_available_module():
+    """
+    Candidate `module load` lines for a module or extension.
+
+    `name` is a module name (every version is resolved, newest first) or a
+    full name such as numpy/2.3.1.
+    """
     name = request.args.get("name", "").strip()
     if not name:
         return jsonify({"error": "A module name is required"}), 400
 
     try:
         catalog = _get_catalog()
-        versions = catalog["records_by_name"].get(name)
-        if not versions:
+        graph = catalog.dependency_graph
+        versions = catalog.records_by_name.get(name)
+        if versions:
+            full_names = [record["full_name"] for record in versions]
+        elif name in graph["requires"] or name in graph["required_by"]:
+            full_names = [name]
+        else:
             return jsonify({"error": f"Module not found: {name}"}), 404
 
-        extensions = catalog["extensions_by_dependency"].get(name, [])
+        return jsonify(
+            {
+                "name": name,
+                "candidates": [
+                    {
+                        "full_name": full_name,
+                        "is_extension": full_name in graph["extensions"],
+                        "required_by_count": len(graph["required_by"].get(full_name, [])),
+                        "plans": resolve_load_plans(graph, full_name),
+                    }
+                    for full_name in full_names
+                ],
+            }
+        )
+    except UnknownClusterError as e:
+        return jsonify({"error": str(e)}), 404
+    except (OSError, json.JSONDecodeError) as e:
+        return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
 
+
+@api.route('/available_modules/where', methods=['GET'])
+@conditional_get(max_age=300)
+def get_module_availability():
+    """Which clusters provide a module, with their versions newest first."""
+    name = request.args.get("name", "").strip()
+    if not name:
+        return jsonify({"error": "A module name is required"}), 400
+
+    try:
+        index = _get_availability_index()
         return jsonify(
             {
                 "name": name,
-                "versions": sorted(versions, key=_version_key, reverse=True),
-                "extensions": sorted(
-                    extensions,
-                    key=lambda record: (
-                        record.get("name", "").casefold(),
-                        _version_key(record),
-                    ),
-                ),
+                "clusters": index.get(name, {}),
+                "searched": sorted(_available_clusters()),
             }
         )
     except (OSError, json.JSONDecodeError) as e:
         return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
+
+
+@api.route('/available_modules/details', methods=['GET'])
+@conditional_get(max_age=300)
+def get_available_module_details():
+    name = request.args.get("name", "").strip()
+    if not name:
+        return jsonify({"error": "A module name is required"}), 400
+
+    try:
+        catalog = _get_catalog()
+        body = catalog.details_json(name)
+        if body is None:
+            return jsonify({"error": f"Module not found: {name}"}), 404
+
+        return _catalog_response(catalog, body, "details", name)
+    except UnknownClusterError as e:
+        return jsonify({"error": str(e)}), 404
+    except (OSError, json.JSONDecodeError) as e:
+        return jsonify({"error": f"Unable to load available modules: {str(e)}"}), 500
@@ -0,0 +1,81 @@
+"""
+Background refresh loop for keeping cached Slurm data warm.
+
+A poller runs its refresh callback on a daemon thread while requests keep
+arriving. Each cycle without a new request doubles the wait before the next
+refresh, up to max_interval; once no request has arrived for idle_timeout the
+thread exits and the next request starts it again. The thread is only started
+on demand, so Passenger can fork workers before any poller runs.
+"""
+import logging
+import time
+from threading import Lock, Thread
+
+
+class BackgroundPoller:
+    def __init__(self, name, refresh, interval=10, max_interval=120, idle_timeout=300, enabled=False):
+        self.name = name
+        self._refresh = refresh
+        self._lock = Lock()
+        self._thread = None
+        self._last_activity = None
+        self.configure(enabled=enabled, interval=interval, max_interval=max_interval, idle_timeout=idle_timeout)
+
+    def configure(self, enabled=None, interval=None, max_interval=None, idle_timeout=None):
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if interval is not None:
+                self.interval = max(1, interval)
+            if max_interval is not None:
+                self.max_interval = max(self.interval, max_interval)
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+
+    def touch(self):
+        """Record request activity, starting the poll thread if it is not running."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._last_activity = time.monotonic()
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._thread = Thread(target=self._run, name=f"{self.name}-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = self.interval
+        last_seen = None
+
+        while True:
+            with self._lock:
+                last_activity = self._last_activity
+                if not self.enabled or time.monotonic() - last_activity > self.idle_timeout:
+                    self._thread = None
+                    return
+
+            # Poll at the base cadence while requests arrive, back off otherwise.
+            delay = self.interval if last_activity != last_seen else min(delay * 2, self.max_interval)
+            last_seen = last_activity
+
+            try:
+                self._refresh(delay)
+            except Exception as e:
+                logging.warning("%s poller refresh failed: %s", self.name, e)
+
+            time.sleep(delay)
+
+    def status(self):
+        with self._lock:
+            running = self._thread is not None and self._thread.is_alive()
+            idle_for = None if self._last_activity is None else time.monotonic() - self._last_activity
+            return {
+                "enabled": self.enabled,
+                "running": running,
+                "interval": self.interval,
+                "max_interval": self.max_interval,
+                "idle_timeout": self.idle_timeout,
+                "idle_seconds": None if idle_for is None else round(idle_for, 1),
+            }
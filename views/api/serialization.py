@@ -0,0 +1,94 @@
+"""
+JSON encoding for payloads that are served many times.
+
+The fast encoder is chosen here, once, for the whole API: orjson when it is
+installed, otherwise ujson, otherwise the standard library. `dumps_json` and
+the app-wide FastJSONEncoder (json_encoder.py) both go through
+`fast_dumps`, so they agree on the library and its options. The fast
+libraries are several times quicker than `json` on large lists of records.
+
+`SerializedPayloads` keeps the encoded body of each named payload for its
+current version, so a payload whose version is known (a file signature, a
+command-output hash) is encoded once per version rather than once per
+request.
+
+No Flask imports here: module_catalog uses this when run as a build script.
+"""
+import json
+from threading import Lock
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # ujson is optional
+    ujson = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif ujson is not None:
+    JSON_BACKEND = "ujson"
+else:
+    JSON_BACKEND = "json"
+
+# Errors the fast libraries raise for values they cannot encode but json
+# may (non-string keys, integers over 64 bits) or an older ujson without
+# `default`; callers fall back to the standard library on these.
+FAST_ENCODE_ERRORS = (TypeError, ValueError, OverflowError)
+
+
+def fast_dumps(payload, sort_keys=False, default=None):
+    """
+    Encode payload as compact UTF-8 JSON bytes with orjson or ujson.
+
+    Non-ASCII text is written as UTF-8 by both. With `default`, dates and
+    dataclasses are handed to it, as the standard library would do. Raises
+    one of FAST_ENCODE_ERRORS on failure, and TypeError when neither library
+    is installed.
+    """
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if default is not None:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        return orjson.dumps(payload, default=default, option=option)
+
+    if JSON_BACKEND == "ujson":
+        options = {"default": default} if default is not None else {}
+        return ujson.dumps(
+            payload, ensure_ascii=False, sort_keys=sort_keys, escape_forward_slashes=False, **options
+        ).encode("utf-8")
+
+    raise TypeError("no fast JSON library is installed")
+
+
+def dumps_json(payload):
+    """Encode payload as compact UTF-8 JSON bytes."""
+    if JSON_BACKEND != "json":
+        try:
+            return fast_dumps(payload)
+        except FAST_ENCODE_ERRORS:
+            pass
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+class SerializedPayloads:
+    """Encoded bodies by payload name; only the latest version of each is kept."""
+
+    def __init__(self):
+        self._bodies = {}
+        self._lock = Lock()
+
+    def get(self, name, version, build):
+        """Return the encoded body of `name` at `version`, calling build() for the payload when it changed."""
+        with self._lock:
+            cached = self._bodies.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        body = dumps_json(build())
+        with self._lock:
+            self._bodies[name] = (version, body)
+        return body
@@ -8,6 +8,8 @@ import os
 import re
 import subprocess
 import logging
+import tempfile
+import threading
 
 PREFERENCES_FILENAME = "_preferences.json"
 
@@ -75,17 +77,60 @@ def parse_storage_to_mib(value):
     return amount * multipliers.get(match.group(2).upper(), 1)
 
 
-def parse_key_value_tokens(output):
-    values = {}
+def _add_scontrol_fields(record, text):
+    """
+    Add the Key=value fields of one line of scontrol output to record.
+
+    scontrol keys are CamelCase words (NodeName, CPUAlloc, MCS_label,
+    CPUs/Task). A whitespace-separated token that does not start with one
+    belongs to the previous value, so values containing spaces such as Reason,
+    OS, Comment or JobName are kept whole, and `=` inside values
+    (CfgTRES=cpu=48,mem=375G, "Reason=... boot_time=1790000000") does not
+    start a new field.
+    """
+    key = None
+
+    for token in text.split():
+        name, separator, value = token.partition("=")
+        if separator and name[:1].isupper():
+            key = name
+            record[key] = value
+        elif key is not None:
+            record[key] = f"{record[key]} {token}" if record[key] else token
+
+
+def parse_scontrol_record(text):
+    """Parse one scontrol record (a --oneliner line or a multi-line block) into a dict."""
+    record = {}
+    _add_scontrol_fields(record, text)
+    return record
+
+
+def iter_scontrol_records(lines):
+    """
+    Yield one dict per record from `scontrol show ...` output lines in a
+    single pass.
+
+    Works with and without --oneliner: a record starts on every line that is
+    not indented, and indented lines continue the current record.
+    """
+    record = None
 
-    for token in output.split():
-        if "=" not in token:
+    for line in lines:
+        if not line.strip():
             continue
 
-        key, value = token.split("=", 1)
-        values[key] = value
+        if not line[0].isspace():
+            if record:
+                yield record
+            record = {}
+        elif record is None:
+            record = {}
 
-    return values
+        _add_scontrol_fields(record, line)
+
+    if record:
+        yield record
 
 
 def split_nonempty_lines(value):
@@ -107,6 +152,47 @@ def run_process_output(command, timeout=20):
     return result.stdout
 
 
+def stream_process_lines(command, timeout=20):
+    """
+    Yield a command's stdout line by line while it runs.
+
+    Nothing is buffered beyond the current line. Stopping early (closing
+    the generator) kills the process. Raises RuntimeError on a non-zero exit
+    and subprocess.TimeoutExpired when the command outlives `timeout`, like
+    run_process_output.
+    """
+    # stderr goes to a file so a chatty command cannot block on a full pipe.
+    stderr = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, encoding="utf-8")
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        for line in process.stdout:
+            yield line
+
+        returncode = process.wait()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+        if returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(stderr.read().strip() or f"{command[0]} exited with status {returncode}")
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr.close()
+
+
 def get_user_email(username):
     """
     Resolve a cluster username to an institutional email address.